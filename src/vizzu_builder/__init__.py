@@ -6,8 +6,8 @@ import pandas as pd
 import streamlit as st
 
 from .data.loader import CsvFileUploader
-from .data.filter import DataFrameFilter
-from .chart import ChartBuilder
+from .debug import DebugPanel
+from .tracing import traced
 
 
 class App:
@@ -16,20 +16,36 @@ class App:
     def __init__(self) -> None:
         self._file_name: str | None = None
         self._df: pd.DataFrame | None = None
+        self._fingerprint: str | None = None
         self._init_page()
-        self._init_csv_file_loader()
-        self._init_builders()
+        with DebugPanel.trace() as trace:
+            self._init_csv_file_loader()
+            self._init_builders()
+        if trace is not None:
+            DebugPanel(trace)
 
     def _init_page(self) -> None:
         st.set_page_config(page_title="Vizzu Builder", page_icon="🏗️")
         st.title("🏗️ Vizzu Builder")
 
+    @traced("app.data")
     def _init_csv_file_loader(self) -> None:
         csv_file_uploader = CsvFileUploader()
         self._file_name = csv_file_uploader.file_name
         self._df = csv_file_uploader.df
+        self._fingerprint = csv_file_uploader.fingerprint
         if self._df is not None:
-            DataFrameFilter(self._df)
+            # the filter, chart and story dependencies are only imported once
+            # a dataset is loaded, the upload page is shown without them
+            # pylint: disable-next=import-outside-toplevel
+            from .data.filter import DataFrameFilter
 
+            DataFrameFilter(self._df, self._fingerprint)
+
+    @traced("app.builders")
     def _init_builders(self) -> None:
-        ChartBuilder(self._file_name, self._df)
+        if self._df is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from .chart import ChartBuilder
+
+            ChartBuilder(self._file_name, self._df, self._fingerprint)
@@ -3,17 +3,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-import json
+import math
 from pathlib import Path
-import black
 import pandas as pd
 import streamlit_vizzu  # type: ignore
 import streamlit as st
 from streamlit_extras.row import row  # type: ignore
 
+from .data.aggregator import DataFrameAggregator
+from .data.dtypes import is_dimension
+from .data.fingerprint import frame_hash
 from .data.generator import DataCodeGenerator
 from .data.parser import DataFrameParser
+from .data.payload import SerializedData
+from .data.reducer import DataFrameReducer
+from .formatter import CodeFormatter
+from .presets import PRESETS_FILE, ChartPreset, PresetIndex
+from .data.predicate import FilterSpec
+from .data.shared import ResourceRegistry
 from .story import StoryBuilder
+from .tracing import traced
 
 
 @dataclass
@@ -33,6 +42,10 @@ class ChartConfig:
     label: str | None = None
     tooltips: bool = True
     key: str | None = None
+    charts_per_page: int = 6
+    # marks drawn per chart, the rest is summed into "Other" or sampled out
+    max_categories: int = 50
+    max_points: int | None = 2000
     keys: list[str] = field(
         default_factory=lambda: [
             "Cat1, Value1",
@@ -44,9 +57,19 @@ class ChartConfig:
 
 
 class ChartBuilder:
-    # pylint: disable=too-few-public-methods
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
 
-    def __init__(self, file_name: str | None, df: pd.DataFrame | None) -> None:
+    PRESETS_FILE: Path = PRESETS_FILE
+    # extra preset files in the format of presets.json
+    PRESET_PACKS: tuple[Path, ...] = ()
+    PRESETS: ResourceRegistry[tuple, PresetIndex] = ResourceRegistry()
+
+    def __init__(
+        self,
+        file_name: str | None,
+        df: pd.DataFrame | None,
+        fingerprint: str | None = None,
+    ) -> None:
         self._file_name = file_name
         self._df = df
         if self._df is not None:
@@ -55,10 +78,18 @@ class ChartBuilder:
                 if "filters" not in st.session_state
                 else st.session_state["filters"]
             )
-            self._presets = self._parse_presets_file()
+            self._filter_spec: FilterSpec = st.session_state.get(
+                "filter_spec", FilterSpec()
+            )
+            self._fingerprint = (
+                fingerprint if fingerprint is not None else frame_hash(self._df)
+            )
+            self._presets = self._get_presets()
             self._config = ChartConfig()
             self._config.categories, self._config.values = self._get_columns()
-            self._story_builder = StoryBuilder(self._file_name, self._df)
+            self._story_builder = StoryBuilder(
+                self._file_name, self._df, self._fingerprint
+            )
             self._add_title()
             with st.form("Chart builder form"):
                 self.select_rows = row(2)
@@ -76,7 +107,7 @@ class ChartBuilder:
         values: list[str | None] = []
         if self._df is not None:
             for column_name in self._df.columns:
-                if self._df[column_name].dtype == object:
+                if is_dimension(self._df[column_name]):
                     categories.append(column_name)
                 else:
                     values.append(column_name)
@@ -146,42 +177,107 @@ class ChartBuilder:
         if self._config.key not in self._config.keys:
             st.warning("Please select at least one category and one value!")
 
-    def _parse_presets_file(self) -> dict:
-        presets_file = Path(__file__).parent / "config/presets.json"
-        presets = {}
-        with open(presets_file, "r", encoding="utf8") as json_file:
-            presets = json.load(json_file)
-        return presets
+    def _get_presets(self) -> PresetIndex:
+        # the presets are compiled once per process and shared by the sessions
+        return self.PRESETS.get(
+            (self.PRESETS_FILE, self.PRESET_PACKS),
+            lambda: PresetIndex.load(self.PRESETS_FILE, self.PRESET_PACKS),
+        )
+
+    def _get_key_presets(self) -> tuple[ChartPreset, ...]:
+        if self._config.key is None or self._config.key not in self._presets:
+            return ()
+        return self._presets[self._config.key]
 
+    @traced("chart.charts")
     def _add_charts(self) -> None:
-        if self._presets and self._config.key:
+        if self._df is not None and self._presets and self._config.key:
             if self._config.key in self._presets:
-                data = streamlit_vizzu.Data()
-                data.add_df(self._df)
-                data.set_filter(self._filters)
-
-                for index in range(0, len(self._presets[self._config.key]), 2):
+                # charts keep their preset index in their keys across pages
+                indices = self._add_pagination()
+                for index in indices[::2]:
                     col1, col2 = st.columns(2)
                     with col1:
-                        self._add_chart(data, index)
+                        self._add_chart(self._df, index)
                     with col2:
                         next_index = index + 1
-                        if next_index < len(self._presets[self._config.key]):
-                            self._add_chart(data, next_index)
+                        if next_index in indices:
+                            self._add_chart(self._df, next_index)
+
+    def _add_pagination(self) -> range:
+        count = len(self._get_key_presets())
+        pages = math.ceil(count / self._config.charts_per_page)
+        page = 1
+        if pages > 1:
+            page = (
+                st.radio(
+                    "Page",
+                    range(1, pages + 1),
+                    horizontal=True,
+                    key=f"page_{self._config.key}",
+                )
+                or 1
+            )
+        start = (page - 1) * self._config.charts_per_page
+        end = min(start + self._config.charts_per_page, count)
+        if pages > 1:
+            st.caption(f"Showing charts {start + 1}-{end} of {count}")
+        return range(start, end)
 
-    def _add_chart(self, data: streamlit_vizzu.Data, index: int) -> None:
-        raw_config = self._presets[self._config.key][index]
-        config = self._process_raw_config(raw_config)
-        self._add_chart_title(raw_config)
+    @traced("chart.data")
+    def _get_chart_data(
+        self, df: pd.DataFrame, preset: ChartPreset
+    ) -> tuple[SerializedData, tuple[str, ...]]:
+        dimensions = [
+            column
+            for column in [self._config.selected_cat1, self._config.selected_cat2]
+            if column is not None
+        ]
+        measures = [
+            column
+            for column in [self._config.selected_value1, self._config.selected_value2]
+            if column is not None
+        ]
+        max_points = self._config.max_points if preset.is_scatter else None
+        key = (self._fingerprint, self._filter_spec)
+        reduction = DataFrameReducer.reduce(
+            key,
+            lambda: DataFrameAggregator.aggregate(
+                self._filter_spec.apply(df, self._fingerprint),
+                dimensions,
+                measures,
+                key=key,
+            ),
+            dimensions,
+            measures,
+            max_categories=self._config.max_categories,
+            max_points=max_points,
+        )
+        # the charts of the grid embed the same serialized data, scatter-like
+        # charts share the sampled one
+        data = SerializedData.of(
+            (key, tuple(dimensions), tuple(measures), max_points),
+            lambda: reduction.df,
+        )
+        return data, reduction.notes
+
+    def _add_chart(self, df: pd.DataFrame, index: int) -> None:
+        preset = self._get_key_presets()[index]
+        config = self._get_config(preset)
+        data, notes = self._get_chart_data(df, preset)
+        self._add_chart_title(preset, notes)
         self._add_chart_animation(index, data, config)
-        self._add_chart_code(config)
+        self._add_chart_code(index, config, notes)
         self._add_save_button(config)
 
-    def _add_chart_title(self, raw_config: dict) -> None:
-        st.subheader(raw_config["chart"])
+    def _add_chart_title(self, preset: ChartPreset, notes: tuple[str, ...]) -> None:
+        st.subheader(preset.chart)
+        for note in notes:
+            st.caption(note)
 
+    @traced("chart.animation")
     def _add_chart_animation(
-        self, index: int, data: streamlit_vizzu.Data, config: dict
+        self, index: int, data: SerializedData, config: dict
     ) -> None:
         chart = streamlit_vizzu.VizzuChart(
             height=300,
@@ -192,27 +288,33 @@ class ChartBuilder:
         chart.feature("tooltip", self._config.tooltips)
         chart.show()
 
-    def _add_chart_code(self, config: dict) -> None:
-        show_code = st.expander("Show code")
-        with show_code:
-            code = []
-            code.append("from streamlit_vizzu import VizzuChart, Data, Config")
-            code.append("import pandas as pd")
-            code += DataCodeGenerator.get_data_code(self._file_name, self._df)
-            code.append("chart = VizzuChart()")
-            if self._config.tooltips:
-                code.append('chart.feature("tooltip", True)')
-            code.append("chart.animate(data)\n")
-            filters = f'Data.filter("{self._filters}"), ' if self._filters else ""
-            code.append(f"chart.animate({filters}Config({config}))\n")
-            code.append("chart.show()")
-            unformatted_code = "\n".join(code)
-            formatted_code = black.format_str(unformatted_code, mode=black.FileMode())
+    def _add_chart_code(self, index: int, config: dict, notes: tuple[str, ...]) -> None:
+        # the code is only generated while it is shown
+        show_code = st.toggle("Show code", key=f"code_{self._config.key}_{index}")
+        if show_code:
             st.code(
-                formatted_code,
+                self._get_chart_code(config, notes),
                 language="python",
             )
 
+    @traced("chart.code")
+    def _get_chart_code(self, config: dict, notes: tuple[str, ...] = ()) -> str:
+        code = []
+        code.append("from streamlit_vizzu import VizzuChart, Data, Config")
+        code.append("import pandas as pd")
+        code += DataCodeGenerator.get_data_code(self._file_name, self._df)
+        if notes:
+            code.append("# The chart in the app shows reduced data:")
+            code += [f"# {note}" for note in notes]
+        code.append("chart = VizzuChart()")
+        if self._config.tooltips:
+            code.append('chart.feature("tooltip", True)')
+        code.append("chart.animate(data)\n")
+        filters = f"Data.filter({self._filters!r}), " if self._filters else ""
+        code.append(f"chart.animate({filters}Config({config}))\n")
+        code.append("chart.show()")
+        return CodeFormatter.format("\n".join(code))
+
     def _add_save_button(self, config: dict) -> None:
         button = st.button(
             "Add Chart to Story", key=str(config), use_container_width=True
@@ -220,36 +322,19 @@ class ChartBuilder:
         if button:
             self._story_builder.add_slide(self._filters, config)
 
-    def _process_raw_config(self, raw_config: dict) -> dict:
-        config = {}
-        for key, value in raw_config.items():
-            if key not in ["chart", "y_range_min", "y_range_max"] and value is not None:
-                if isinstance(value, list):
-                    value = [self._replace_config(v) for v in value]
-                else:
-                    value = self._replace_config(value)
-                config[key] = value
-        if "y" in config:
-            config["y"] = {"set": config["y"]}
-        if "y_range_min" in raw_config and raw_config["y_range_min"] is not None:
-            config["y"] = config.get("y", {})
-            config["y"]["range"] = config["y"].get("range", {})
-            config["y"]["range"]["min"] = raw_config["y_range_min"]
-        if "y_range_max" in raw_config and raw_config["y_range_max"] is not None:
-            config["y"] = config.get("y", {})
-            config["y"]["range"] = config["y"].get("range", {})
-            config["y"]["range"]["max"] = raw_config["y_range_max"]
+    def _get_config(self, preset: ChartPreset) -> dict:
+        config = preset.bind(
+            {
+                "Cat1": self._config.selected_cat1,
+                "Cat2": self._config.selected_cat2,
+                "Value1": self._config.selected_value1,
+                "Value2": self._config.selected_value2,
+            }
+        )
         if self._config.label is not None:
             config["label"] = self._config.label
         return config
 
-    def _replace_config(self, value: str | list[str]) -> str | list[str]:
-        if isinstance(value, str):
-            value = value.replace("Cat1", self._config.selected_cat1 or "")
-            value = value.replace("Cat2", self._config.selected_cat2 or "")
-            value = value.replace("Value1", self._config.selected_value1 or "")
-            value = value.replace("Value2", self._config.selected_value2 or "")
-        return value
-
+    @traced("chart.story")
     def _add_story(self) -> None:
         self._story_builder.play()
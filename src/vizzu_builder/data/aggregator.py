@@ -0,0 +1,44 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from typing import Hashable
+
+import pandas as pd
+
+from .cache import LruCache, df_nbytes
+
+
+class DataFrameAggregator:
+    # pylint: disable=too-few-public-methods
+
+    CACHE: LruCache[tuple, pd.DataFrame] = LruCache(
+        max_size=64, max_bytes=256 * 1024**2, size_of=df_nbytes
+    )
+
+    @classmethod
+    def aggregate(
+        cls,
+        df: pd.DataFrame,
+        dimensions: list[str],
+        measures: list[str],
+        key: Hashable,
+    ) -> pd.DataFrame:
+        # Vizzu sums the measures over the dimensions on the channels,
+        # so pre-summing over every selected dimension renders the same charts
+        cache_key = (key, tuple(dimensions), tuple(measures))
+        aggregated = cls.CACHE.get(cache_key)
+        if aggregated is None:
+            # float32 measures are summed in double precision
+            columns = df[dimensions].assign(
+                **{measure: df[measure].astype(float) for measure in measures}
+            )
+            aggregated = (
+                columns.groupby(dimensions, dropna=False, sort=False, observed=True)[
+                    measures
+                ]
+                .sum()
+                .reset_index()
+            )
+            cls.CACHE.put(cache_key, aggregated)
+        return aggregated
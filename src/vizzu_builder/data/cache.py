@@ -0,0 +1,108 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Generic, Hashable, TypeVar
+
+import pandas as pd
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    nbytes: int
+
+
+class LruCache(Generic[K, V]):
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        max_size: int,
+        max_bytes: int | None = None,
+        size_of: Callable[[V], int] | None = None,
+    ) -> None:
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._size_of = size_of
+        self._items: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = Lock()
+
+    def __contains__(self, key: K) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._items),
+                nbytes=self._nbytes,
+            )
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+            return item[0]
+
+    def put(self, key: K, value: V) -> None:
+        nbytes = self._size_of(value) if self._size_of is not None else 0
+        if self._max_bytes is not None and nbytes > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._nbytes -= self._items.pop(key)[1]
+            self._items[key] = (value, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is None:
+                return None
+            self._nbytes -= item[1]
+            return item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._nbytes = 0
+
+    def _evict(self) -> None:
+        while len(self._items) > self._max_size or (
+            self._max_bytes is not None and self._nbytes > self._max_bytes
+        ):
+            _, (_, nbytes) = self._items.popitem(last=False)
+            self._nbytes -= nbytes
+            self._evictions += 1
+
+
+def df_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
@@ -0,0 +1,74 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import math
+
+from ipyvizzu import Data
+import pandas as pd
+
+from .dtypes import is_dimension, is_measure, to_vizzu
+
+
+class CompactData:
+    # pylint: disable=too-few-public-methods
+
+    @classmethod
+    def of(
+        cls, df: pd.DataFrame, columns: list[str], filtered_columns: set[str]
+    ) -> Data:
+        df = df[columns]
+        # ipyvizzu treats numeric columns as measures, everything else as dimension
+        dimensions = [column for column in columns if is_dimension(df[column])]
+        measures = [column for column in columns if is_measure(df[column])]
+        data = Data()
+        # record filters on measures need the rows, otherwise Vizzu only shows
+        # the sums over the dimensions
+        if dimensions and measures and not filtered_columns.intersection(measures):
+            df = cls._aggregate(df, dimensions, measures)
+            if cls._is_complete_cube(df, dimensions):
+                cls._add_cube(data, df, dimensions, measures)
+                return data
+        data.add_df(to_vizzu(df))
+        return data
+
+    @staticmethod
+    def _aggregate(
+        df: pd.DataFrame, dimensions: list[str], measures: list[str]
+    ) -> pd.DataFrame:
+        df = df.copy()
+        for dimension in dimensions:
+            df[dimension] = df[dimension].astype(str).where(df[dimension].notna(), "")
+        for measure in measures:
+            # float32 measures are summed in double precision
+            df[measure] = df[measure].astype(float)
+        return (
+            df.groupby(dimensions, sort=False, observed=True)[measures]
+            .sum()
+            .reset_index()
+        )
+
+    @staticmethod
+    def _is_complete_cube(df: pd.DataFrame, dimensions: list[str]) -> bool:
+        # missing combinations would show up as zero values in a cube
+        return len(df) == math.prod(df[column].nunique() for column in dimensions)
+
+    @staticmethod
+    def _add_cube(
+        data: Data, df: pd.DataFrame, dimensions: list[str], measures: list[str]
+    ) -> None:
+        # every dimension value is stored once, measures are indexed by them
+        levels = [pd.unique(df[dimension]).tolist() for dimension in dimensions]
+        index = (
+            pd.MultiIndex.from_product(levels, names=dimensions)
+            if len(dimensions) > 1
+            else pd.Index(levels[0], name=dimensions[0])
+        )
+        cube = df.set_index(dimensions).reindex(index)
+        shape = [len(level) for level in levels]
+        for dimension, level in zip(dimensions, levels):
+            data.add_dimension(dimension, level)
+        for measure in measures:
+            data.add_measure(
+                measure, cube[measure].to_numpy(dtype=float).reshape(shape).tolist()
+            )
@@ -0,0 +1,164 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+import uuid
+
+import pandas as pd
+import pyarrow as pa  # type: ignore
+
+from .cache import CacheStats
+from .fingerprint import combine_hash, content_hash
+
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    # pylint: disable=too-many-instance-attributes
+
+    # Frames stored as uncompressed Arrow IPC files, named by their key. They
+    # are memory-mapped on reload, the least recently used files are removed
+    # above max_bytes. The directory can be shared by server processes.
+
+    SUFFIX: str = ".arrow"
+    # bumped when the stored frames change in a way the sources do not show
+    FORMAT: int = 1
+    # the modules that read and type the frames, stored frames of other
+    # versions of them are not served
+    SOURCES: tuple[str, ...] = ("reader", "parser", "profile", "sketch", "dtypes")
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._version = self.get_version()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = Lock()
+
+    @classmethod
+    def from_env(cls) -> DiskCache | None:
+        # disabled unless VIZZU_BUILDER_CACHE_DIR is set
+        directory = os.environ.get("VIZZU_BUILDER_CACHE_DIR")
+        if not directory:
+            return None
+        max_mb = int(os.environ.get("VIZZU_BUILDER_CACHE_MB", "2048"))
+        return cls(Path(directory), max_mb * 1024**2)
+
+    @classmethod
+    def get_version(cls) -> str:
+        parts: list[object] = [cls.FORMAT, pd.__version__, pa.__version__]
+        for name in cls.SOURCES:
+            path = Path(__file__).with_name(f"{name}.py")
+            try:
+                parts.append(content_hash(path.read_bytes()))
+            except OSError:
+                parts.append(name)
+        return combine_hash(*parts)[:16]
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            files = self._list()
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(files),
+                nbytes=sum(size for _, _, size in files),
+            )
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        path = self._get_path(key)
+        try:
+            with pa.memory_map(str(path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+        except (OSError, pa.ArrowException) as exc:
+            logger.warning("cached frame %s dropped: %s", path.name, exc)
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            self._count(hit=False)
+            return None
+        try:
+            # marks the file as recently used for the eviction
+            os.utime(path)
+        except OSError:
+            # e.g. a read-only directory, the frame is still served
+            pass
+        self._count(hit=True)
+        # the columns without nulls are views of the mapped file
+        df: pd.DataFrame = table.to_pandas(split_blocks=True)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError) as exc:
+            # e.g. object columns of mixed types
+            logger.info("frame %s not cached: %s", key, exc)
+            return
+        if table.nbytes > self._max_bytes:
+            return
+        path = self._get_path(key)
+        # written under a temporary name and renamed, readers never see a
+        # partial file
+        temporary = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.tmp")
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            with pa.OSFile(str(temporary), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(temporary, path)
+        except (OSError, pa.ArrowException) as exc:
+            logger.warning("frame %s not cached: %s", key, exc)
+            temporary.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._evict()
+
+    def _get_path(self, key: str) -> Path:
+        # frames of other versions are left to the eviction
+        return self._directory / f"{key}-{self._version}{self.SUFFIX}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _list(self) -> list[tuple[float, Path, int]]:
+        files = []
+        if self._directory.is_dir():
+            for path in self._directory.glob(f"*{self.SUFFIX}"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, path, stat.st_size))
+        return files
+
+    def _evict(self) -> None:
+        files = sorted(self._list())
+        nbytes = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if nbytes <= self._max_bytes:
+                break
+            # mapped frames of other sessions keep the removed file's data
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as exc:
+                logger.warning("cached frame %s not removed: %s", path.name, exc)
+                continue
+            nbytes -= size
+            self._evictions += 1
@@ -0,0 +1,58 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# dimensions with at most this share of distinct values are stored as category
+CATEGORY_RATIO: float = 0.5
+
+
+def is_dimension(column: pd.Series) -> bool:
+    # the same rule ipyvizzu uses: numeric columns are measures,
+    # everything else is a dimension
+    return not is_numeric_dtype(column.dtype)
+
+
+def is_measure(column: pd.Series) -> bool:
+    return not is_dimension(column)
+
+
+def to_dimension(column: pd.Series, nunique: int | None = None) -> pd.Series:
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+    if nunique is None:
+        nunique = column.nunique()
+    if nunique <= len(column) * CATEGORY_RATIO:
+        # every distinct value is stored once, rows only hold integer codes
+        return column.astype("category")
+    return column
+
+
+def to_measure(column: pd.Series) -> pd.Series:
+    # float32 is kept only when every value survives the round trip
+    try:
+        values = column.astype(np.float64)
+    except (TypeError, ValueError):
+        # large columns are offered as measures from a sample, the values that
+        # are not numbers become missing
+        values = pd.to_numeric(column, errors="coerce").astype(np.float64)
+    downcast = values.astype(np.float32)
+    if np.array_equal(downcast.to_numpy(np.float64), values.to_numpy(), equal_nan=True):
+        return downcast
+    return values
+
+
+def to_vizzu(df: pd.DataFrame) -> pd.DataFrame:
+    # ipyvizzu fills the missing dimension values with "", which a category
+    # rejects, so categories are handed over as plain objects
+    categories = [
+        column
+        for column in df.columns
+        if isinstance(df[column].dtype, pd.CategoricalDtype)
+    ]
+    if categories:
+        return df.astype(dict.fromkeys(categories, object))
+    return df
@@ -2,108 +2,141 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 import streamlit as st
 import pandas as pd
-from pandas.api.types import (
-    CategoricalDtype,
-    is_datetime64_any_dtype,
-    is_numeric_dtype,
-    is_object_dtype,
-)
 from streamlit_extras.row import row  # type: ignore
 
+from .dtypes import is_measure
+from .fingerprint import frame_hash
+from .predicate import (
+    CategoricalPredicate,
+    DateRangePredicate,
+    FilterSpec,
+    NumericRangePredicate,
+    Predicate,
+    TextPredicate,
+)
+from .profile import DataFrameProfile
+from .sketch import nice_step
+from ..tracing import traced
+
+
+APPROXIMATE_HELP = (
+    "The bounds are estimated from a sample, the ends include the values beyond"
+)
+
 
 class DataFrameFilter:
     # pylint: disable=too-few-public-methods
 
-    def __init__(self, df: pd.DataFrame) -> None:
-        self._df = df.copy()
-        self._filters: list[str] = []
+    @traced("filter")
+    def __init__(self, df: pd.DataFrame, fingerprint: str | None = None) -> None:
+        self._df = df
+        self._fingerprint = fingerprint if fingerprint is not None else frame_hash(df)
+        self._profile = DataFrameProfile.of(df, self._fingerprint)
+        self._predicates: list[Predicate] = []
         modify = st.toggle("Add filters")
         if modify:
-            self._convert_datetimes()
             self._set_filters()
 
+    @traced("filter.widgets")
     def _set_filters(self) -> None:
         modification_container = st.container()
         with modification_container:
             to_filter_columns = st.multiselect("Filter dataframe on", self._df.columns)
             rows = row(2)
             for column in to_filter_columns:
-                # Treat columns with < 10 unique values as categorical
-                if (
-                    isinstance(self._df[column].dtype, CategoricalDtype)
-                    or self._df[column].nunique() < 10
-                ):
+                # Treat columns with < 10 unique values as categorical,
+                # dimensions are stored as category regardless of their size
+                if self._profile[column].nunique < 10:
                     user_cat_input = rows.multiselect(
                         f"Values for {column}",
-                        self._df[column].unique(),
-                        default=list(self._df[column].unique()),
+                        self._get_unique_values(column),
+                        default=list(self._get_unique_values(column)),
                     )
-                    self._filters.append(
-                        "||".join(
-                            [f"record['{column}'] == '{cat}'" for cat in user_cat_input]
-                        )
+                    self._predicates.append(
+                        CategoricalPredicate(column, tuple(user_cat_input))
                     )
-                elif is_numeric_dtype(self._df[column]):
-                    _min = float(self._df[column].min())
-                    _max = float(self._df[column].max())
-                    step = (_max - _min) / 100
-                    user_num_input = rows.slider(
-                        f"Values for {column}",
-                        min_value=_min,
-                        max_value=_max,
-                        value=(_min, _max),
-                        step=step,
-                    )
-                    self._filters.append(
-                        f"record['{column}'] >= {user_num_input[0]} "
-                        f"&& record['{column}'] <= {user_num_input[1]}"
-                    )
-                elif is_datetime64_any_dtype(self._df[column]):
-                    user_date_input = rows.date_input(
-                        f"Values for {column}",
-                        value=(
-                            self._df[column].min(),
-                            self._df[column].max(),
-                        ),
-                    )
-                    if len(user_date_input) == 2:
-                        user_date_input = tuple(map(pd.to_datetime, user_date_input))
-                        start_date, end_date = user_date_input
-                        # self._df = self._df.loc[self._df[column].between(start_date, end_date)]
-                        self._filters.append(
-                            f"record['{column}'] <= '{end_date}' "
-                            f"&& record['{column}'] >= '{start_date}'"
-                        )
+                elif is_measure(self._df[column]):
+                    self._add_numeric_filter(rows, column)
+                elif self._profile.datetime_profile(column) is not None:
+                    # only the filtered columns are parsed as datetimes
+                    self._add_date_filter(rows, column)
                 else:
                     user_text_input = rows.text_input(
                         f"Substring or regex in {column}",
                     )
                     if user_text_input:
-                        self._filters.append(
-                            f"record['{column}'].includes('{user_text_input}')"
-                        )
-                        # self._df = self._df[
-                        #     self._df[column].astype(str).str.contains(user_text_input)
-                        # ]
+                        self._predicates.append(TextPredicate(column, user_text_input))
 
-                    # raise NotImplementedError("Cannot filter on this column currently")
-
-        filters_wrapped = [f"({_f})" for _f in self._filters]
+        filter_spec = FilterSpec(tuple(self._predicates))
+        if filter_spec:
+            self._add_row_count(filter_spec)
         if st.button("Update data"):
-            st.session_state["filters"] = (
-                " && ".join(filters_wrapped) if filters_wrapped else None
+            # the spec filters the rows on the server, the JavaScript expression
+            # is kept for the generated code and the story
+            st.session_state["filter_spec"] = filter_spec
+            st.session_state["filters"] = filter_spec.to_js()
+
+    def _add_numeric_filter(self, rows: Any, column: str) -> None:
+        profile = self._profile[column]
+        if profile.min is None or profile.max is None or profile.min >= profile.max:
+            # no values or a single one, there is no range to select
+            rows.caption(f"{column} has no range of values to filter")
+            return
+        _min = float(profile.min)
+        _max = float(profile.max)
+        step = (_max - _min) / 100
+        if profile.is_approximate:
+            step = nice_step(_max - _min)
+        user_num_input = rows.slider(
+            f"Values for {column}",
+            min_value=_min,
+            max_value=_max,
+            value=(_min, _max),
+            step=step,
+            help=APPROXIMATE_HELP if profile.is_approximate else None,
+        )
+        low, high = user_num_input
+        if profile.is_approximate:
+            # sampled bounds leave the outliers out, an end keeps them
+            low = None if low <= _min else low
+            high = None if high >= _max else high
+        self._predicates.append(NumericRangePredicate(column, low, high))
+
+    def _add_date_filter(self, rows: Any, column: str) -> None:
+        profile = self._profile.datetime_profile(column)
+        if profile is None:
+            return
+        user_date_input = rows.date_input(
+            f"Values for {column}",
+            value=(profile.min, profile.max),
+            help=APPROXIMATE_HELP if profile.is_approximate else None,
+        )
+        if len(user_date_input) == 2:
+            start: pd.Timestamp = pd.to_datetime(user_date_input[0])
+            # the last selected day is included until its end
+            end: pd.Timestamp = pd.to_datetime(user_date_input[1]) + pd.Timedelta(
+                days=1
             )
+            start_date: pd.Timestamp | None = start
+            end_date: pd.Timestamp | None = end
+            if profile.is_approximate:
+                start_date = None if start <= profile.min else start
+                end_date = None if end > profile.max else end
+            self._predicates.append(DateRangePredicate(column, start_date, end_date))
 
-    def _convert_datetimes(self) -> None:
-        # Try to convert datetimes into a standard format (datetime, no timezone)
-        for col in self._df.columns:
-            if is_object_dtype(self._df[col]):
-                try:
-                    self._df[col] = pd.to_datetime(self._df[col])
-                except Exception:  # pylint: disable=broad-exception-caught
-                    pass
+    @traced("filter.count")
+    def _add_row_count(self, filter_spec: FilterSpec) -> None:
+        # unchanged predicates are served from the cached column masks,
+        # ranges from the sorted index of their column
+        count = filter_spec.count(self._df, self._fingerprint)
+        st.caption(f"{count:,} of {len(self._df):,} rows match")
 
-            if is_datetime64_any_dtype(self._df[col]):
-                self._df[col] = self._df[col].dt.tz_localize(None)
+    def _get_unique_values(self, column: str) -> tuple:
+        unique = self._profile[column].unique
+        if unique is None:
+            unique = tuple(self._df[column].unique())
+        return unique
@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import pandas as pd
 
+from .dtypes import is_dimension
+from .reader import DataFrameReader
+
 
 class DataCodeGenerator:
     # pylint: disable=too-few-public-methods
@@ -14,12 +17,18 @@ class DataCodeGenerator:
         if file_name is not None and df is not None:
             d_types = []
             for column in df.columns:
-                if df[column].dtype == object:
+                # categories are an in-memory detail, ipyvizzu expects strings
+                if is_dimension(df[column]):
                     d_types.append(f'"{column}": str')
                 else:
                     d_types.append(f'"{column}": float')
             code.append(f'd_types={{{", ".join(d_types)}}}')
-            code.append(f'df = pd.read_csv("{file_name}", dtype=d_types)')
+            if file_name.lower().endswith(DataFrameReader.PARQUET_SUFFIXES):
+                code.append(f'df = pd.read_parquet("{file_name}").astype(d_types)')
+            elif file_name.lower().endswith(DataFrameReader.ARROW_SUFFIXES):
+                code.append(f'df = pd.read_feather("{file_name}").astype(d_types)')
+            else:
+                code.append(f'df = pd.read_csv("{file_name}", dtype=d_types)')
             code.append("data = Data()")
             code.append("data.add_df(df)\n")
         return code
@@ -3,20 +3,50 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Callable
 import pandas as pd
+import pyarrow as pa  # type: ignore
 import streamlit as st
+from streamlit.runtime.uploaded_file_manager import UploadedFile
+from .cache import LruCache, df_nbytes
+from .disk_cache import DiskCache
+from .dtypes import is_dimension
+from .fingerprint import combine_hash, content_hash
 from .parser import DataFrameParser
+from .reader import DataFrameReader
+from .shared import ResourceRegistry
+from ..tracing import traced
 
 
 class CsvFileUploader:
     SAMPLE_DATA: str = "sample/music_data.csv"
+    FILE_TYPES: list[str] = ["csv", "gz", "parquet", "arrow", "feather"]
+    READ_CSV_OPTIONS: dict = {}
+    # defaults of the ingest options, None reads every row
+    MAX_ROWS: int | None = None
+    SAMPLE: float | None = None
+    CACHE: LruCache[str, pd.DataFrame] = LruCache(
+        max_size=16, max_bytes=1024**3, size_of=df_nbytes
+    )
+    # typed datasets referenced by the sessions, shared between the sessions
+    # that uploaded the same content and selected the same types
+    DATASETS: ResourceRegistry[str, pd.DataFrame] = ResourceRegistry(
+        LruCache(max_size=4, max_bytes=512 * 1024**2, size_of=df_nbytes)
+    )
+    FILES: ResourceRegistry[str, bytes] = ResourceRegistry()
+    # read and typed datasets kept across restarts, see DiskCache.from_env
+    DISK_CACHE: DiskCache | None = DiskCache.from_env()
 
     def __init__(self) -> None:
-        self._csv_file: str | None = None
+        self._csv_file: str | UploadedFile | None = None
         self._df: pd.DataFrame | None = None
+        self._fingerprint: str | None = None
+        self._max_rows = self.MAX_ROWS
+        self._sample = self.SAMPLE
 
         self._add_title()
         self._add_upload_button()
+        self._add_ingest_options()
         self._parse_csv_file()
         self._init_data_frame_parser()
 
@@ -24,22 +54,46 @@ class CsvFileUploader:
     def df(self) -> pd.DataFrame | None:
         return self._df
 
+    @property
+    def fingerprint(self) -> str | None:
+        return self._fingerprint
+
     @property
     def file_name(self) -> str | None:
         if self._csv_file:
             if isinstance(self._csv_file, str):
                 return Path(self.SAMPLE_DATA).name
-            return self._csv_file.name
+            return str(self._csv_file.name)
         return None
 
     def _add_title(self) -> None:
         st.subheader("Upload Data")
 
     def _add_upload_button(self) -> None:
-        self._csv_file = st.file_uploader("Upload a CSV file", type=["csv"])  # type: ignore
+        self._csv_file = st.file_uploader(
+            "Upload a CSV, Parquet or Arrow file", type=self.FILE_TYPES
+        )
         if not self._csv_file:
             self._add_sample_data()
 
+    def _add_ingest_options(self) -> None:
+        if self._csv_file is not None:
+            with st.expander("Ingest options"):
+                max_rows = st.number_input(
+                    "Row limit (0 reads every row)",
+                    min_value=0,
+                    value=self._max_rows or 0,
+                    step=100_000,
+                )
+                sample = st.slider(
+                    "Sample rows (%)",
+                    min_value=1,
+                    max_value=100,
+                    value=round((self._sample or 1) * 100),
+                )
+            self._max_rows = int(max_rows) or None
+            self._sample = sample / 100 if sample < 100 else None
+
     def _add_sample_data(self) -> None:
         if st.toggle("Use sample data"):
             self._csv_file = self.SAMPLE_DATA
@@ -50,21 +104,99 @@ class CsvFileUploader:
                 mime="text/csv",
             )
 
-    def _read_sample_data(self) -> str:
-        with open(
-            self.SAMPLE_DATA,
-            "r",
-            encoding="utf8",
-        ) as csv:
-            return csv.read()
+    def _read_sample_data(self) -> bytes:
+        # the sample file is read once per process
+        return self.FILES.get(self.SAMPLE_DATA, Path(self.SAMPLE_DATA).read_bytes)
+
+    def _read_csv_content(self) -> bytes:
+        if isinstance(self._csv_file, UploadedFile):
+            return self._csv_file.getvalue()
+        return self._read_sample_data()
+
+    def _get_content_hash(self) -> str:
+        # the content is hashed once per upload or version of the sample file,
+        # not on every rerun
+        if isinstance(self._csv_file, UploadedFile):
+            source: tuple = ("upload", self._csv_file.file_id)
+        else:
+            path = Path(self.SAMPLE_DATA)
+            source = ("sample", str(path), path.stat().st_mtime_ns)
+        cached = st.session_state.get("content_hash")
+        if cached is None or cached[0] != source:
+            cached = (source, content_hash(self._read_csv_content()))
+            st.session_state["content_hash"] = cached
+        hash_value: str = cached[1]
+        return hash_value
 
+    @traced("uploader.read")
     def _parse_csv_file(self) -> None:
         if self._csv_file is not None:
-            self._df = pd.read_csv(self._csv_file)
+            self._fingerprint = combine_hash(
+                self._get_content_hash(),
+                sorted(self.READ_CSV_OPTIONS.items()),
+                self._max_rows,
+                self._sample,
+            )
+            df = self.CACHE.get(self._fingerprint)
+            if df is None:
+                try:
+                    df = self._load(
+                        self._fingerprint,
+                        lambda: self._read_data_frame(self._read_csv_content()),
+                    )
+                except (ValueError, OSError, EOFError, pa.ArrowException) as exc:
+                    # malformed or truncated files, the page goes on without data
+                    st.error(f"Could not read {self.file_name}: {exc}")
+                    self._fingerprint = None
+                    return
+                self.CACHE.put(self._fingerprint, df)
+            self._df = df
+
+    def _read_data_frame(self, content: bytes) -> pd.DataFrame:
+        reader = DataFrameReader(
+            self.file_name or "",
+            max_rows=self._max_rows,
+            sample=self._sample,
+            csv_options=self.READ_CSV_OPTIONS,
+        )
+        progress = st.empty()
+        preview = st.empty()
+
+        def on_chunk(chunk: pd.DataFrame, rows: int, fraction: float) -> None:
+            progress.progress(min(fraction, 1.0), text=f"Read {rows:,} rows")
+            if rows == len(chunk):
+                preview.dataframe(chunk.head(10))
 
+        try:
+            return reader.read(content, on_chunk)
+        finally:
+            progress.empty()
+            preview.empty()
+
+    def _load(self, key: str, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        if self.DISK_CACHE is None:
+            return build()
+        df = self.DISK_CACHE.get(key)
+        if df is None:
+            df = build()
+            self.DISK_CACHE.put(key, df)
+        return df
+
+    @traced("uploader.types")
     def _init_data_frame_parser(self) -> None:
         if self._df is not None:
-            DataFrameParser(self._df).process_dataframe()
+            parser = DataFrameParser(self._df, self._fingerprint)
+            parser.process_dataframe()
+            # the typed dataset is identified by the upload and the type choices
+            self._fingerprint = combine_hash(self._fingerprint, parser.column_types)
+            fingerprint = self._fingerprint
+            dataset = self.DATASETS.acquire(
+                fingerprint, lambda: self._load(fingerprint, parser.convert_dataframe)
+            )
+            # the session keeps its dataset referenced until it switches to
+            # another one or its state is dropped
+            st.session_state["dataset"] = dataset
+            self._df = dataset.value
             with st.expander("Show data"):
                 self._show_data()
 
@@ -72,7 +204,7 @@ class CsvFileUploader:
         if self._df is not None:
             types = [
                 DataFrameParser.DIMENSION
-                if self._df[col].dtype == object
+                if is_dimension(self._df[col])
                 else DataFrameParser.MEASURE
                 for col in self._df.columns
             ]
@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 import pandas as pd
-from streamlit_extras.row import row  # type: ignore
+from pandas.api.types import is_object_dtype
+
+from .dtypes import to_dimension, to_measure
+from .profile import DataFrameProfile
+from ..tracing import traced
 
 
 class DataFrameParser:
@@ -12,37 +16,76 @@ class DataFrameParser:
     DIMENSION: str = "Category"
     MEASURE: str = "Value"
 
-    def __init__(self, df: pd.DataFrame) -> None:
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        fingerprint: str | None = None,
+        column_types: dict[str, str] | None = None,
+    ) -> None:
         self._df = df
-        self.rows = row(3)
+        self._profile = DataFrameProfile.of(df, fingerprint)
+        # without widgets the columns keep their detected types unless set here
+        self._column_types: dict[str, str] = {
+            column_name: self._get_default_type(column_name)
+            for column_name in df.columns
+            if self._is_column_convertible_to_float(column_name)
+        }
+        self._column_types.update(column_types or {})
+
+    @property
+    def column_types(self) -> dict[str, str]:
+        return self._column_types
 
+    @traced("parser.widgets")
     def process_dataframe(self) -> None:
         self._add_column_types()
 
+    @traced("parser.convert")
+    def convert_dataframe(self) -> pd.DataFrame:
+        # the typed frame is built from new columns, the input frame is left
+        # intact so that it can be shared between sessions
+        return pd.DataFrame(
+            {
+                column_name: self._convert_column(column_name)
+                for column_name in self._df.columns
+            }
+        )
+
     def _add_column_types(self) -> None:
+        # streamlit_extras is only imported once a dataset is loaded
+        # pylint: disable-next=import-outside-toplevel
+        from streamlit_extras.row import row  # type: ignore
+
+        rows = row(3)
         column_names = self._df.columns
         for column_name in column_names:
             if not self._is_column_convertible_to_float(column_name):
                 continue
-            index = (
-                1 if pd.api.types.is_numeric_dtype(self._df[column_name].dtype) else 0
-            )
-            selected_type = self.rows.selectbox(
+            index = 1 if self._profile[column_name].is_numeric else 0
+            selected_type = rows.selectbox(
                 f"Set type for {column_name}",
                 [DataFrameParser.DIMENSION, DataFrameParser.MEASURE],
                 index=index,
             )
-            self._convert_column(column_name, selected_type)
+            self._column_types[column_name] = selected_type
+
+    def _get_default_type(self, column_name: str) -> str:
+        if self._profile[column_name].is_numeric:
+            return DataFrameParser.MEASURE
+        return DataFrameParser.DIMENSION
 
     def _is_column_convertible_to_float(self, column_name: str) -> bool:
-        try:
-            self._df[column_name].astype(float)
-            return True
-        except ValueError:
-            return False
+        return self._profile[column_name].is_float_convertible
 
-    def _convert_column(self, column_name: str, selected_type: str) -> None:
+    def _convert_column(self, column_name: str) -> pd.Series:
+        column = self._df[column_name]
+        nunique = self._profile[column_name].nunique
+        selected_type = self._column_types.get(column_name)
         if selected_type == DataFrameParser.DIMENSION:
-            self._df[column_name] = self._df[column_name].astype(str)
-        else:
-            self._df[column_name] = self._df[column_name].astype(float)
+            return to_dimension(column.astype(str), nunique)
+        if selected_type == DataFrameParser.MEASURE:
+            return to_measure(column)
+        # text columns cannot be measures, they are stored as categories as well
+        if is_object_dtype(column.dtype):
+            return to_dimension(column, nunique)
+        return column
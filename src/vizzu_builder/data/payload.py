@@ -0,0 +1,47 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import json
+from typing import Callable, Hashable
+
+from ipyvizzu import Data
+from ipyvizzu.animation import AbstractAnimation
+from ipyvizzu.json import RawJavaScript, RawJavaScriptEncoder
+import pandas as pd
+
+from .cache import LruCache
+from .dtypes import to_vizzu
+
+
+class SerializedData(AbstractAnimation):
+    # Data animation that is validated and serialized once and then embedded
+    # as is into the animation of every chart that shows it
+    CACHE: LruCache[Hashable, SerializedData] = LruCache(
+        max_size=16, max_bytes=256 * 1024**2, size_of=lambda data: len(data.raw)
+    )
+
+    def __init__(self, raw: str) -> None:
+        self._raw = raw
+
+    @property
+    def raw(self) -> str:
+        return self._raw
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> SerializedData:
+        data = Data()
+        data.add_df(to_vizzu(df))
+        data.build()
+        return cls(json.dumps(data, cls=RawJavaScriptEncoder))
+
+    @classmethod
+    def of(cls, key: Hashable, get_df: Callable[[], pd.DataFrame]) -> SerializedData:
+        data = cls.CACHE.get(key)
+        if data is None:
+            data = cls.from_df(get_df())
+            cls.CACHE.put(key, data)
+        return data
+
+    def build(self) -> dict:
+        return {"data": RawJavaScript(self._raw)}
@@ -0,0 +1,295 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import json
+import re
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+from .cache import LruCache
+from .fingerprint import frame_hash
+from .profile import DataFrameProfile
+from .sorted_index import SortedIndex
+
+
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+
+def to_js_string(value: object) -> str:
+    # user values are emitted as escaped string literals, a JSON string is a
+    # valid JavaScript one
+    return json.dumps(str(value))
+
+
+@dataclass(frozen=True)
+class Predicate(ABC):
+    column: str
+
+    @property
+    def js_column(self) -> str:
+        return f"record[{to_js_string(self.column)}]"
+
+    @abstractmethod
+    def mask(self, column: pd.Series) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def to_js(self) -> str:
+        ...
+
+
+@dataclass(frozen=True)
+class ValuePredicate(Predicate):
+    # Evaluated once per distinct value and broadcast through factorized codes
+
+    @abstractmethod
+    def mask_values(self, values: pd.Index) -> np.ndarray:
+        ...
+
+    def mask(self, column: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        mask: np.ndarray = self.mask_values(pd.Index(uniques))[codes]
+        return mask
+
+
+@dataclass(frozen=True)
+class CategoricalPredicate(ValuePredicate):
+    values: tuple
+
+    def mask_values(self, values: pd.Index) -> np.ndarray:
+        return np.asarray(values.isin(self.values), dtype=bool)
+
+    def to_js(self) -> str:
+        if not self.values:
+            return "false"
+        return "||".join(
+            [f"{self.js_column} == {to_js_string(value)}" for value in self.values]
+        )
+
+
+@dataclass(frozen=True)
+class RangePredicate(Predicate):
+    # Selects a range of sortable keys, served from a sorted index of the column
+
+    @abstractmethod
+    def keys(self, column: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        # the sortable keys of the values and the mask of the missing ones
+        ...
+
+    @abstractmethod
+    def bounds(self) -> tuple[float | None, float | None]:
+        # the range in keys, None leaves that end open
+        ...
+
+    def mask(self, column: pd.Series) -> np.ndarray:
+        values, missing = self.keys(column)
+        low, high = self.bounds()
+        mask: np.ndarray = ~missing
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+        return mask
+
+
+@dataclass(frozen=True)
+class NumericRangePredicate(RangePredicate):
+    # None leaves that end of the range open
+    min: float | None
+    max: float | None
+
+    def keys(self, column: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        values = column.to_numpy(dtype=float, na_value=np.nan)
+        return values, np.isnan(values)
+
+    def bounds(self) -> tuple[float | None, float | None]:
+        return self.min, self.max
+
+    def to_js(self) -> str:
+        conditions = [f"{self.js_column} != null"]
+        if self.min is not None:
+            conditions.append(f"{self.js_column} >= {self.min}")
+        if self.max is not None:
+            conditions.append(f"{self.js_column} <= {self.max}")
+        return " && ".join(conditions[1:] or conditions)
+
+
+@dataclass(frozen=True)
+class DateRangePredicate(RangePredicate):
+    # start <= value < end, None leaves that end of the range open, a selected
+    # last day is included with an end at the midnight after it
+    start: pd.Timestamp | None
+    end: pd.Timestamp | None
+
+    def keys(self, column: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        if not is_datetime64_any_dtype(column.dtype):
+            column = pd.to_datetime(column, errors="coerce")
+        column = column.dt.tz_localize(None)
+        # nanoseconds keep the order and the precision of the timestamps
+        values = column.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        return values, column.isna().to_numpy()
+
+    def bounds(self) -> tuple[float | None, float | None]:
+        return (
+            None if self.start is None else self.start.value,
+            # the keys are integer nanoseconds, the last one before the end
+            None if self.end is None else self.end.value - 1,
+        )
+
+    def to_js(self) -> str:
+        conditions = [f"{self.js_column} != null"]
+        if self.end is not None:
+            conditions.append(f"{self.js_column} < {self._to_js_date(self.end)}")
+        if self.start is not None:
+            conditions.append(f"{self.js_column} >= {self._to_js_date(self.start)}")
+        return " && ".join(conditions[1:] or conditions)
+
+    @staticmethod
+    def _to_js_date(value: pd.Timestamp) -> str:
+        # the records hold the dates as text, a midnight is compared as its
+        # date, which sorts before the times of that day and after the earlier
+        # days with or without a time
+        if value == value.normalize():
+            return to_js_string(value.date().isoformat())
+        return to_js_string(value)
+
+
+@dataclass(frozen=True)
+class TextPredicate(ValuePredicate):
+    pattern: str
+
+    @property
+    def is_regex(self) -> bool:
+        if not REGEX_METACHARACTERS.intersection(self.pattern):
+            return False
+        try:
+            re.compile(self.pattern)
+            return True
+        except re.error:
+            return False
+
+    def mask_values(self, values: pd.Index) -> np.ndarray:
+        # missing values do not match, not even as "nan"
+        matches = values.astype(str).str.contains(self.pattern, regex=self.is_regex)
+        mask: np.ndarray = np.asarray(matches, dtype=bool) & ~pd.isna(values)
+        return mask
+
+    def to_js(self) -> str:
+        pattern = to_js_string(self.pattern)
+        if self.is_regex:
+            return f"new RegExp({pattern}).test({self.js_column})"
+        return f"{self.js_column}.includes({pattern})"
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    predicates: tuple[Predicate, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.predicates)
+
+    def mask(self, df: pd.DataFrame, fingerprint: str | None = None) -> np.ndarray:
+        if fingerprint is None:
+            fingerprint = frame_hash(df)
+        mask = np.ones(len(df), dtype=bool)
+        for predicate in self.predicates:
+            # filters of a previously loaded dataset may not apply
+            if predicate.column in df.columns:
+                mask &= ColumnMasks.get(df, fingerprint, predicate)
+        return mask
+
+    def count(self, df: pd.DataFrame, fingerprint: str | None = None) -> int:
+        predicates = [
+            predicate for predicate in self.predicates if predicate.column in df.columns
+        ]
+        if len(predicates) == 1 and isinstance(predicates[0], RangePredicate):
+            # a single range is counted by binary search, without a mask
+            if fingerprint is None:
+                fingerprint = frame_hash(df)
+            index = ColumnMasks.get_index(df, fingerprint, predicates[0])
+            return index.count(*predicates[0].bounds())
+        return int(self.mask(df, fingerprint).sum())
+
+    def apply(self, df: pd.DataFrame, fingerprint: str | None = None) -> pd.DataFrame:
+        if not self.predicates:
+            return df
+        return df[self.mask(df, fingerprint)]
+
+    def to_js(self) -> str | None:
+        filters_wrapped = [f"({predicate.to_js()})" for predicate in self.predicates]
+        return " && ".join(filters_wrapped) if filters_wrapped else None
+
+
+class ColumnMasks:
+    # pylint: disable=too-few-public-methods
+
+    # Masks are stored as bitmaps, keyed by dataset fingerprint and predicate
+    MASKS: LruCache[tuple[str, Predicate], np.ndarray] = LruCache(
+        max_size=256, max_bytes=256 * 1024**2, size_of=lambda bits: bits.nbytes
+    )
+    CODES: LruCache[tuple[str, str], tuple[np.ndarray, pd.Index]] = LruCache(
+        max_size=64,
+        max_bytes=512 * 1024**2,
+        size_of=lambda item: item[0].nbytes + item[1].memory_usage(deep=True),
+    )
+    # built on the first range filter of a column, reused while its bounds change
+    INDEXES: LruCache[tuple[str, str, str], SortedIndex] = LruCache(
+        max_size=64, max_bytes=1024**3, size_of=lambda index: index.nbytes
+    )
+
+    @classmethod
+    def get(
+        cls, df: pd.DataFrame, fingerprint: str, predicate: Predicate
+    ) -> np.ndarray:
+        key = (fingerprint, predicate)
+        bits = cls.MASKS.get(key)
+        if bits is None:
+            column = df[predicate.column]
+            if isinstance(predicate, ValuePredicate):
+                codes, uniques = cls._factorize(fingerprint, column)
+                mask = predicate.mask_values(uniques)[codes]
+            elif isinstance(predicate, RangePredicate):
+                index = cls.get_index(df, fingerprint, predicate)
+                mask = index.mask(*predicate.bounds())
+            else:
+                mask = predicate.mask(column)
+            bits = np.packbits(mask)
+            cls.MASKS.put(key, bits)
+        return np.unpackbits(bits, count=len(df)).astype(bool)
+
+    @classmethod
+    def get_index(
+        cls, df: pd.DataFrame, fingerprint: str, predicate: RangePredicate
+    ) -> SortedIndex:
+        key = (fingerprint, predicate.column, type(predicate).__name__)
+        index = cls.INDEXES.get(key)
+        if index is None:
+            column = df[predicate.column]
+            if isinstance(predicate, DateRangePredicate):
+                # the dates are parsed once per dataset, by the profile that
+                # also bounds the date filter
+                datetimes = DataFrameProfile.of(df, fingerprint).datetimes(
+                    predicate.column
+                )
+                if datetimes is not None:
+                    column = datetimes
+            index = SortedIndex(*predicate.keys(column))
+            cls.INDEXES.put(key, index)
+        return index
+
+    @classmethod
+    def _factorize(
+        cls, fingerprint: str, column: pd.Series
+    ) -> tuple[np.ndarray, pd.Index]:
+        key = (fingerprint, str(column.name))
+        factorized = cls.CODES.get(key)
+        if factorized is None:
+            codes, uniques = pd.factorize(column, use_na_sentinel=False)
+            factorized = (codes, pd.Index(uniques))
+            cls.CODES.put(key, factorized)
+        return factorized
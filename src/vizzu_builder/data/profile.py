@@ -0,0 +1,234 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+import warnings
+
+import pandas as pd
+from pandas.api.types import (
+    is_datetime64_any_dtype,
+    is_numeric_dtype,
+    is_object_dtype,
+)
+
+from .cache import LruCache
+from .dtypes import is_dimension
+from .fingerprint import frame_hash
+from .sketch import distinct_values, estimate_distinct, sample
+
+
+@dataclass(frozen=True)
+class ColumnProfile:
+    # pylint: disable=too-many-instance-attributes
+
+    name: str
+    is_dimension: bool
+    is_numeric: bool
+    is_float_convertible: bool
+    nunique: int
+    # None when the column has more than DataFrameProfile.MAX_UNIQUE values
+    unique: tuple | None
+    # bounds of numeric columns
+    min: Any
+    max: Any
+    # nunique is an estimate above MAX_UNIQUE and the bounds are sampled
+    # quantiles that leave the outliers out
+    is_approximate: bool = False
+
+
+@dataclass(frozen=True)
+class DatetimeProfile:
+    # bounds of the parsed values, sampled quantiles when approximate
+    min: pd.Timestamp
+    max: pd.Timestamp
+    is_approximate: bool = False
+
+
+class DataFrameProfile:
+    MAX_UNIQUE: int = 1000
+    # frames with more rows are profiled from samples
+    APPROXIMATE_ROWS: int = 1_000_000
+    SAMPLE_ROWS: int = 100_000
+    QUANTILES: tuple[float, float] = (0.001, 0.999)
+    CACHE: LruCache[str, dict[str, ColumnProfile]] = LruCache(max_size=32)
+    # columns are only parsed as datetimes once they are filtered, None marks
+    # the columns that are not parseable
+    DATETIME_PROFILES: LruCache[str, dict[str, DatetimeProfile | None]] = LruCache(
+        max_size=32
+    )
+    # the parsed values of the datetime parseable columns
+    DATETIMES: LruCache[tuple[str, str], pd.Series] = LruCache(
+        max_size=32, max_bytes=512 * 1024**2, size_of=lambda column: column.nbytes
+    )
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        key: str,
+        columns: dict[str, ColumnProfile],
+        datetime_columns: dict[str, DatetimeProfile | None],
+    ) -> None:
+        self._df = df
+        self._key = key
+        self._columns = columns
+        self._datetime_columns = datetime_columns
+
+    def __getitem__(self, column_name: str) -> ColumnProfile:
+        # columns are profiled when they are first used, the profiles are
+        # shared by every user of the same frame
+        profile = self._columns.get(column_name)
+        if profile is None:
+            profile = self._profile_column(column_name, self._df[column_name])
+            self._columns[column_name] = profile
+        return profile
+
+    @property
+    def is_approximate(self) -> bool:
+        return len(self._df) > self.APPROXIMATE_ROWS
+
+    @classmethod
+    def of(cls, df: pd.DataFrame, fingerprint: str | None = None) -> DataFrameProfile:
+        key = fingerprint if fingerprint is not None else frame_hash(df)
+        columns = cls.CACHE.get(key)
+        if columns is None:
+            columns = {}
+            cls.CACHE.put(key, columns)
+        datetime_columns = cls.DATETIME_PROFILES.get(key)
+        if datetime_columns is None:
+            datetime_columns = {}
+            cls.DATETIME_PROFILES.put(key, datetime_columns)
+        return cls(df, key, columns, datetime_columns)
+
+    def datetime_profile(self, column_name: str) -> DatetimeProfile | None:
+        # None for the columns without parseable, non-missing values
+        if column_name not in self._datetime_columns:
+            self._datetime_columns[column_name] = self._profile_datetimes(
+                column_name, self._df[column_name]
+            )
+        return self._datetime_columns[column_name]
+
+    def datetimes(self, column_name: str) -> pd.Series | None:
+        # parsed once, when the column is first used as a datetime
+        if self.datetime_profile(column_name) is None:
+            return None
+        datetimes = self.DATETIMES.get((self._key, column_name))
+        if datetimes is None:
+            datetimes = self._parse_datetimes(self._df[column_name])
+            if datetimes is not None:
+                self.DATETIMES.put((self._key, column_name), datetimes)
+        return datetimes
+
+    def _profile_column(self, column_name: str, column: pd.Series) -> ColumnProfile:
+        if self.is_approximate:
+            return self._profile_column_approximately(column_name, column)
+        unique = column.unique()
+        nunique = int(pd.notna(unique).sum())
+        low, high = None, None
+        if is_numeric_dtype(column.dtype):
+            low, high = self._get_bounds(column)
+        return ColumnProfile(
+            name=column_name,
+            is_dimension=is_dimension(column),
+            is_numeric=is_numeric_dtype(column.dtype),
+            is_float_convertible=self._is_float_convertible(column),
+            nunique=nunique,
+            unique=tuple(unique) if len(unique) <= self.MAX_UNIQUE else None,
+            min=low,
+            max=high,
+        )
+
+    def _profile_column_approximately(
+        self, column_name: str, column: pd.Series
+    ) -> ColumnProfile:
+        unique = self._get_distinct_values(column)
+        if unique is not None:
+            nunique = int(pd.notna(unique).sum())
+        else:
+            nunique = estimate_distinct(column, self.SAMPLE_ROWS)
+        values = sample(column, self.SAMPLE_ROWS)
+        low, high = None, None
+        if is_numeric_dtype(values.dtype):
+            bounds = values.dropna().astype(float)
+            if len(bounds):
+                low, high = bounds.quantile(list(self.QUANTILES)).tolist()
+            if low is None or low == high:
+                # sparse or skewed columns, the sample gives no range
+                low, high = self._get_bounds(column)
+        return ColumnProfile(
+            name=column_name,
+            is_dimension=is_dimension(column),
+            is_numeric=is_numeric_dtype(column.dtype),
+            # the other columns are decided from the sample, not converted whole
+            is_float_convertible=is_numeric_dtype(column.dtype)
+            or self._is_float_convertible(values),
+            nunique=nunique,
+            unique=tuple(unique) if unique is not None else None,
+            min=low,
+            max=high,
+            is_approximate=True,
+        )
+
+    def _profile_datetimes(
+        self, column_name: str, column: pd.Series
+    ) -> DatetimeProfile | None:
+        if self.is_approximate:
+            # a failure on the sample rules the column out without a full pass
+            if self._parse_datetimes(sample(column, self.SAMPLE_ROWS)) is None:
+                return None
+        datetimes = self._parse_datetimes(column)
+        if datetimes is None:
+            return None
+        self.DATETIMES.put((self._key, column_name), datetimes)
+        if self.is_approximate:
+            bounds = sample(datetimes, self.SAMPLE_ROWS).dropna()
+            if bounds.empty:
+                return None
+            low, high = bounds.quantile(list(self.QUANTILES)).tolist()
+            return DatetimeProfile(low, high, is_approximate=True)
+        if not datetimes.notna().any():
+            return None
+        return DatetimeProfile(datetimes.min(), datetimes.max())
+
+    def _get_distinct_values(self, column: pd.Series) -> pd.Index | None:
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # the categories are known without scanning the rows
+            categories = column.cat.categories
+            if len(categories) > self.MAX_UNIQUE:
+                return None
+            if column.hasnans:
+                return pd.Index([*categories, None])
+            return categories
+        return distinct_values(column, self.MAX_UNIQUE)
+
+    @staticmethod
+    def _get_bounds(column: pd.Series) -> tuple[Any, Any]:
+        # None for the columns without values
+        low, high = column.min(), column.max()
+        if pd.isna(low) or pd.isna(high):
+            return None, None
+        return low, high
+
+    @staticmethod
+    def _is_float_convertible(column: pd.Series) -> bool:
+        try:
+            column.astype(float)
+            return True
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _parse_datetimes(column: pd.Series) -> pd.Series | None:
+        if is_datetime64_any_dtype(column.dtype):
+            return column.dt.tz_localize(None)
+        if is_object_dtype(column.dtype) or isinstance(
+            column.dtype, pd.CategoricalDtype
+        ):
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)
+                    return pd.to_datetime(column).dt.tz_localize(None)
+            except Exception:  # pylint: disable=broad-exception-caught
+                return None
+        return None
@@ -0,0 +1,143 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from io import BytesIO
+from typing import Callable, Iterator, Literal
+
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+import pyarrow as pa  # type: ignore
+
+
+class DataFrameReader:
+    # pylint: disable=too-few-public-methods
+
+    CHUNK_SIZE: int = 100_000
+    PARQUET_SUFFIXES: tuple[str, ...] = (".parquet", ".pq")
+    ARROW_SUFFIXES: tuple[str, ...] = (".arrow", ".feather", ".ipc")
+    COMPRESSIONS: dict[str, Literal["gzip"]] = {".gz": "gzip"}
+
+    def __init__(
+        self,
+        file_name: str,
+        max_rows: int | None = None,
+        sample: float | None = None,
+        csv_options: dict | None = None,
+    ) -> None:
+        self._file_name = file_name.lower()
+        self._max_rows = max_rows
+        self._sample = sample
+        self._csv_options = csv_options or {}
+
+    def read(
+        self,
+        content: bytes,
+        on_chunk: Callable[[pd.DataFrame, int, float], None] | None = None,
+    ) -> pd.DataFrame:
+        if self._file_name.endswith(self.PARQUET_SUFFIXES):
+            frames = self._collect(self._read_parquet(content), on_chunk)
+        elif self._file_name.endswith(self.ARROW_SUFFIXES):
+            frames = self._collect(self._read_arrow(content), on_chunk)
+        else:
+            frames = self._collect(self._read_csv(content), on_chunk)
+            # the csv chunks are typed separately, a column that is text in
+            # some of them is read again as text in all, as a single read does
+            mixed = self._get_mixed_columns(frames)
+            if mixed:
+                frames = self._collect(self._read_csv(content, mixed), on_chunk)
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0].reset_index(drop=True)
+        return pd.concat(frames, ignore_index=True)
+
+    def _collect(
+        self,
+        chunks: Iterator[tuple[pd.DataFrame, float]],
+        on_chunk: Callable[[pd.DataFrame, int, float], None] | None,
+    ) -> list[pd.DataFrame]:
+        frames: list[pd.DataFrame] = []
+        rows = 0
+        for index, (chunk, fraction) in enumerate(chunks):
+            if self._sample is not None and self._sample < 1:
+                # the sampled rows keep their order in the file
+                chunk = chunk.sample(frac=self._sample, random_state=index).sort_index()
+            if self._max_rows is not None:
+                chunk = chunk.head(self._max_rows - rows)
+            frames.append(chunk)
+            rows += len(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk, rows, fraction)
+            if self._max_rows is not None and rows >= self._max_rows:
+                break
+        return frames
+
+    @staticmethod
+    def _get_mixed_columns(frames: list[pd.DataFrame]) -> list[str]:
+        # the columns typed differently by the chunks, numbers of different
+        # types are reconciled by the concatenation
+        mixed = []
+        for column in frames[0].columns if frames else []:
+            dtypes = {frame[column].dtype for frame in frames}
+            numeric = all(
+                is_numeric_dtype(dtype) and not is_bool_dtype(dtype) for dtype in dtypes
+            )
+            if len(dtypes) > 1 and not numeric:
+                mixed.append(column)
+        return mixed
+
+    def _read_csv(
+        self, content: bytes, text_columns: list[str] | None = None
+    ) -> Iterator[tuple[pd.DataFrame, float]]:
+        compression = next(
+            (
+                compression
+                for suffix, compression in self.COMPRESSIONS.items()
+                if self._file_name.endswith(suffix)
+            ),
+            None,
+        )
+        options = dict(self._csv_options)
+        if text_columns:
+            dtype = options.get("dtype")
+            options["dtype"] = {
+                **(dtype if isinstance(dtype, dict) else {}),
+                **{column: str for column in text_columns},
+            }
+        buffer = BytesIO(content)
+        with pd.read_csv(
+            buffer,
+            chunksize=self.CHUNK_SIZE,
+            compression=compression,
+            **options,
+        ) as reader:
+            for chunk in reader:
+                yield chunk, buffer.tell() / max(len(content), 1)
+
+    def _read_parquet(self, content: bytes) -> Iterator[tuple[pd.DataFrame, float]]:
+        # pyarrow.parquet is only imported once a parquet file is read
+        # pylint: disable-next=import-outside-toplevel
+        import pyarrow.parquet as pq  # type: ignore
+
+        # the buffer wraps the uploaded bytes without copying them
+        parquet_file = pq.ParquetFile(pa.BufferReader(content))
+        total = max(parquet_file.metadata.num_rows, 1)
+        rows = 0
+        for batch in parquet_file.iter_batches(batch_size=self.CHUNK_SIZE):
+            rows += batch.num_rows
+            yield batch.to_pandas(), rows / total
+
+    def _read_arrow(self, content: bytes) -> Iterator[tuple[pd.DataFrame, float]]:
+        try:
+            reader = pa.ipc.open_file(pa.BufferReader(content))
+            batches = [
+                reader.get_batch(index) for index in range(reader.num_record_batches)
+            ]
+        except pa.ArrowInvalid:
+            batches = list(pa.ipc.open_stream(pa.BufferReader(content)))
+        total = max(sum(batch.num_rows for batch in batches), 1)
+        rows = 0
+        for batch in batches:
+            rows += batch.num_rows
+            yield batch.to_pandas(), rows / total
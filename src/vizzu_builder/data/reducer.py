@@ -0,0 +1,100 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+import pandas as pd
+
+from .cache import LruCache, df_nbytes
+
+
+@dataclass(frozen=True)
+class Reduction:
+    df: pd.DataFrame
+    # what was left out, shown with the chart and in its code
+    notes: tuple[str, ...]
+
+
+class DataFrameReducer:
+    # pylint: disable=too-few-public-methods
+
+    OTHER: str = "Other"
+    CACHE: LruCache[Hashable, Reduction] = LruCache(
+        max_size=64,
+        max_bytes=256 * 1024**2,
+        size_of=lambda reduction: df_nbytes(reduction.df),
+    )
+
+    @classmethod
+    def reduce(
+        cls,
+        key: Hashable,
+        get_df: Callable[[], pd.DataFrame],
+        dimensions: list[str],
+        measures: list[str],
+        *,
+        max_categories: int,
+        max_points: int | None = None,
+    ) -> Reduction:
+        # pylint: disable=too-many-arguments
+        # get_df is the aggregated data, one row per mark. Scatter-like charts
+        # pass max_points and are sampled, the others keep their top
+        # categories and sum the rest into one.
+        cache_key = (
+            key,
+            tuple(dimensions),
+            tuple(measures),
+            max_categories,
+            max_points,
+        )
+        reduction = cls.CACHE.get(cache_key)
+        if reduction is None:
+            df = get_df()
+            if max_points is not None:
+                reduction = cls._sample(df, max_points)
+            else:
+                reduction = cls._bucket(df, dimensions, measures, max_categories)
+            cls.CACHE.put(cache_key, reduction)
+        return reduction
+
+    @classmethod
+    def _bucket(
+        cls,
+        df: pd.DataFrame,
+        dimensions: list[str],
+        measures: list[str],
+        max_categories: int,
+    ) -> Reduction:
+        notes = []
+        for dimension in dimensions:
+            nunique = df[dimension].nunique(dropna=False)
+            if nunique <= max_categories:
+                continue
+            groups = df.groupby(dimension, dropna=False, sort=False, observed=True)
+            totals = groups[measures[0]].sum() if measures else groups.size()
+            top = totals.nlargest(max_categories).index
+            column = df[dimension].astype(object)
+            df = df.assign(**{dimension: column.where(column.isin(top), cls.OTHER)})
+            ranking = f" by {measures[0]}" if measures else ""
+            notes.append(
+                f"{dimension}: top {max_categories} of {nunique:,} values{ranking},"
+                f' the rest as "{cls.OTHER}"'
+            )
+        if notes:
+            df = (
+                df.groupby(dimensions, dropna=False, sort=False, observed=True)[
+                    measures
+                ]
+                .sum()
+                .reset_index()
+            )
+        return Reduction(df, tuple(notes))
+
+    @staticmethod
+    def _sample(df: pd.DataFrame, max_points: int) -> Reduction:
+        if len(df) <= max_points:
+            return Reduction(df, ())
+        sample = df.sample(n=max_points, random_state=0).sort_index()
+        return Reduction(sample, (f"{max_points:,} of {len(df):,} points sampled",))
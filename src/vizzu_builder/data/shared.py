@@ -0,0 +1,106 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Generic, Hashable, TypeVar
+import weakref
+
+from .cache import LruCache
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class RegistryStats:
+    live: int
+    references: int
+    idle: int
+    builds: int
+
+
+class SharedResource(Generic[V]):
+    # A reference to a registry entry, the entry is released when the
+    # reference is released or garbage collected, e.g. with its session state
+
+    def __init__(self, value: V, release: Callable[[], None]) -> None:
+        self._value = value
+        self._finalizer = weakref.finalize(self, release)
+
+    @property
+    def value(self) -> V:
+        return self._value
+
+    def release(self) -> None:
+        # a finalizer runs at most once
+        self._finalizer()
+
+
+class ResourceRegistry(Generic[K, V]):
+    # Process-wide, reference counted store of objects that are shared by the
+    # sessions read-only. Unreferenced entries are kept in the idle cache.
+
+    def __init__(self, idle: LruCache[K, V] | None = None) -> None:
+        self._idle: LruCache[K, V] = idle if idle is not None else LruCache(0)
+        self._live: dict[K, tuple[V, int]] = {}
+        self._pinned: dict[K, SharedResource[V]] = {}
+        self._build_locks: dict[K, Lock] = {}
+        self._builds = 0
+        self._lock = Lock()
+
+    @property
+    def stats(self) -> RegistryStats:
+        with self._lock:
+            return RegistryStats(
+                live=len(self._live),
+                references=sum(references for _, references in self._live.values()),
+                idle=len(self._idle),
+                builds=self._builds,
+            )
+
+    def acquire(self, key: K, build: Callable[[], V]) -> SharedResource[V]:
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, Lock())
+        # identical resources requested concurrently are built only once
+        with build_lock:
+            with self._lock:
+                value = self._retain(key)
+            if value is None:
+                value = build()
+                with self._lock:
+                    self._builds += 1
+                    self._live[key] = (value, 1)
+        return SharedResource(value, lambda: self._release(key))
+
+    def get(self, key: K, build: Callable[[], V]) -> V:
+        # pinned for the lifetime of the process
+        with self._lock:
+            resource = self._pinned.get(key)
+        if resource is None:
+            resource = self.acquire(key, build)
+            with self._lock:
+                resource = self._pinned.setdefault(key, resource)
+        return resource.value
+
+    def _retain(self, key: K) -> V | None:
+        if key in self._live:
+            value, references = self._live[key]
+            self._live[key] = (value, references + 1)
+            return value
+        idle = self._idle.pop(key)
+        if idle is not None:
+            self._live[key] = (idle, 1)
+        return idle
+
+    def _release(self, key: K) -> None:
+        with self._lock:
+            value, references = self._live[key]
+            if references > 1:
+                self._live[key] = (value, references - 1)
+                return
+            del self._live[key]
+            self._build_locks.pop(key, None)
+            self._idle.put(key, value)
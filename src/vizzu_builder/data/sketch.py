@@ -0,0 +1,86 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+CHUNK_SIZE: int = 1 << 16
+
+
+def distinct_values(column: pd.Series, limit: int) -> pd.Index | None:
+    # the distinct values in order of appearance, or None as soon as there
+    # are more than limit, without hashing the rest of the column
+    distinct = column.iloc[:0]
+    for start in range(0, len(column), CHUNK_SIZE):
+        chunk = column.iloc[start : start + CHUNK_SIZE].drop_duplicates()
+        distinct = pd.concat([distinct, chunk]).drop_duplicates()
+        if len(distinct) > limit:
+            return None
+    values: pd.Index = pd.Index(distinct)
+    return values
+
+
+def sample(column: pd.Series, rows: int) -> pd.Series:
+    # uniform sample with replacement, drawing it does not touch every row
+    if len(column) <= rows:
+        return column
+    positions = np.random.default_rng(0).integers(0, len(column), rows)
+    return column.iloc[np.sort(positions)]
+
+
+def estimate_distinct(column: pd.Series, rows: int) -> int:
+    # A sketch of a sample sees the values of low and medium cardinality
+    # columns, a mostly distinct sample points to a key-like column
+    values = sample(column, rows)
+    sketch = HyperLogLog()
+    sketch.update(values)
+    distinct = sketch.estimate()
+    if len(values) < len(column) and distinct > len(values) / 2:
+        distinct *= len(column) / len(values)
+    return min(round(distinct), len(column))
+
+
+def nice_step(span: float, steps: int = 100) -> float:
+    # a 1, 2 or 5 times power of ten step that splits span into about steps
+    if not span > 0:
+        return 0.0
+    raw = span / steps
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return float(factor * magnitude)
+    return float(10 * magnitude)
+
+
+class HyperLogLog:
+    # Cardinality sketch with 2**precision registers, about
+    # 1.04 / sqrt(2**precision) relative error
+
+    def __init__(self, precision: int = 12) -> None:
+        self._precision = precision
+        self._registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> None:
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(np.uint64)
+        index = (hashes >> np.uint64(64 - self._precision)).astype(np.intp)
+        rest = hashes << np.uint64(self._precision)
+        bits = 64 - self._precision
+        # position of the first set bit of the remaining bits
+        with np.errstate(divide="ignore"):
+            leading = 63 - np.floor(np.log2(rest.astype(np.float64)))
+        rank = np.where(rest == 0, bits + 1, np.minimum(leading + 1, bits + 1))
+        np.maximum.at(self._registers, index, rank.astype(np.uint8))
+
+    def estimate(self) -> float:
+        size = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size**2 / float(np.sum(2.0 ** -self._registers.astype(float)))
+        zeros = int(np.count_nonzero(self._registers == 0))
+        if raw <= 2.5 * size and zeros:
+            # linear counting is more precise for small cardinalities
+            return size * math.log(size / zeros)
+        return raw
@@ -0,0 +1,40 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import numpy as np
+
+
+class SortedIndex:
+    # Row positions ordered by value, a range of values is a contiguous slice
+    # of it, found by binary search. Missing values are left out.
+
+    def __init__(self, values: np.ndarray, missing: np.ndarray) -> None:
+        self._size = len(values)
+        positions = np.flatnonzero(~missing)
+        order = np.argsort(values[positions], kind="stable")
+        self._positions = positions[order]
+        self._values = values[self._positions]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._positions.nbytes + self._values.nbytes)
+
+    def range(self, low: float | None = None, high: float | None = None) -> slice:
+        # rows with low <= value <= high, None leaves that end open
+        start = 0 if low is None else int(np.searchsorted(self._values, low, "left"))
+        end = (
+            len(self._values)
+            if high is None
+            else int(np.searchsorted(self._values, high, "right"))
+        )
+        return slice(start, max(start, end))
+
+    def count(self, low: float | None = None, high: float | None = None) -> int:
+        selected = self.range(low, high)
+        return int(selected.stop - selected.start)
+
+    def mask(self, low: float | None = None, high: float | None = None) -> np.ndarray:
+        mask = np.zeros(self._size, dtype=bool)
+        mask[self._positions[self.range(low, high)]] = True
+        return mask
@@ -0,0 +1,82 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from typing import ContextManager
+
+import pandas as pd
+import streamlit as st
+
+from .tracing import RerunTrace
+
+
+class DebugPanel:
+    # pylint: disable=too-few-public-methods
+
+    # Sidebar with the spans of the last rerun, shown when tracing is enabled
+
+    @staticmethod
+    def trace() -> ContextManager[RerunTrace | None]:
+        # the options are set in the panel of the previous rerun
+        return RerunTrace.start(
+            memory=st.session_state.get("debug_memory", False),
+            profile=st.session_state.pop("debug_profile", False),
+        )
+
+    def __init__(self, trace: RerunTrace) -> None:
+        self._trace = trace
+        with st.sidebar:
+            st.subheader("Debug")
+            st.caption(f"Rerun took {trace.seconds * 1000:,.1f} ms")
+            self._add_spans()
+            self._add_downloads()
+            self._add_profile()
+            st.toggle("Trace memory", key="debug_memory")
+            st.button("Profile next rerun", on_click=self._request_profile)
+
+    def _add_spans(self) -> None:
+        spans = pd.DataFrame(
+            {
+                "span": [" " * span.depth + span.name for span in self._trace.spans],
+                "ms": [span.seconds * 1000 for span in self._trace.spans],
+            }
+        )
+        if self._trace.memory:
+            spans["peak MB"] = [
+                (span.peak_bytes or 0) / 1024**2 for span in self._trace.spans
+            ]
+            spans["net MB"] = [
+                (span.net_bytes or 0) / 1024**2 for span in self._trace.spans
+            ]
+        st.dataframe(spans, hide_index=True, use_container_width=True)
+
+    def _add_downloads(self) -> None:
+        st.download_button(
+            "Download spans (JSON)",
+            data=self._trace.to_json(),
+            file_name="rerun.json",
+            mime="application/json",
+        )
+        st.download_button(
+            "Download trace events",
+            data=self._trace.to_trace_events(),
+            file_name="rerun.trace.json",
+            mime="application/json",
+        )
+
+    def _add_profile(self) -> None:
+        profile_text = self._trace.get_profile_text()
+        profile_data = self._trace.get_profile_data()
+        if profile_text is not None and profile_data is not None:
+            with st.expander("Profile"):
+                st.code(profile_text, language="text")
+            st.download_button(
+                "Download profile",
+                data=profile_data,
+                file_name="rerun.prof",
+                mime="application/octet-stream",
+            )
+
+    @staticmethod
+    def _request_profile() -> None:
+        st.session_state["debug_profile"] = True
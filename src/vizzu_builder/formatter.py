@@ -0,0 +1,26 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from .data.cache import LruCache
+from .tracing import traced
+
+
+class CodeFormatter:
+    # pylint: disable=too-few-public-methods
+
+    # The unformatted code already contains the file name, the dtypes,
+    # the filters, the config and the tooltip setting
+    CACHE: LruCache[str, str] = LruCache(max_size=256)
+
+    @classmethod
+    @traced("code.format")
+    def format(cls, code: str) -> str:
+        formatted_code = cls.CACHE.get(code)
+        if formatted_code is None:
+            # black is only imported once code is requested
+            import black  # pylint: disable=import-outside-toplevel
+
+            formatted_code = black.format_str(code, mode=black.FileMode())
+            cls.CACHE.put(code, formatted_code)
+        return formatted_code
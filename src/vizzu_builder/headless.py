@@ -0,0 +1,284 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cache
+import json
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Any, Iterable, Iterator
+
+from ipyvizzu import Data
+from ipyvizzustory import Slide
+from ipyvizzustory.env.py.story import Story
+import pandas as pd
+
+from .data.cache import LruCache, df_nbytes
+from .data.compact import CompactData
+from .data.dtypes import to_vizzu
+from .data.fingerprint import combine_hash, content_hash
+from .data.parser import DataFrameParser
+from .data.predicate import (
+    CategoricalPredicate,
+    DateRangePredicate,
+    FilterSpec,
+    NumericRangePredicate,
+    Predicate,
+    TextPredicate,
+)
+from .data.reader import DataFrameReader
+from .presets import PRESETS_FILE, SLOTS, ChartPreset, PresetIndex
+from .slides import SlideConfig
+
+
+@dataclass(frozen=True)
+class SlideSpec:
+    chart: str
+    # column roles, e.g. {"Cat1": "Genres", "Value1": "Popularity"}
+    columns: dict[str, str]
+    filters: FilterSpec = FilterSpec()
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> SlideSpec:
+        return cls(
+            chart=raw["chart"],
+            columns=dict(raw["columns"]),
+            filters=FilterSpec(
+                tuple(cls._get_predicate(item) for item in raw.get("filters", []))
+            ),
+        )
+
+    @staticmethod
+    def _get_predicate(raw: dict[str, Any]) -> Predicate:
+        column = raw["column"]
+        if "values" in raw:
+            return CategoricalPredicate(column, tuple(raw["values"]))
+        if "pattern" in raw:
+            return TextPredicate(column, raw["pattern"])
+        if "start" in raw or "end" in raw:
+            start, end = raw.get("start"), raw.get("end")
+            return DateRangePredicate(
+                column,
+                None if start is None else pd.Timestamp(start),
+                None if end is None else SlideSpec._get_end(pd.Timestamp(end)),
+            )
+        if "min" in raw or "max" in raw:
+            return NumericRangePredicate(column, raw.get("min"), raw.get("max"))
+        raise ValueError(f"unknown filter on {column}: {raw}")
+
+    @staticmethod
+    def _get_end(end: pd.Timestamp) -> pd.Timestamp:
+        # an end date includes that day, as in the app, an end time is exclusive
+        if end == end.normalize():
+            return end + pd.Timedelta(days=1)
+        return end
+
+
+@dataclass(frozen=True)
+class StorySpec:
+    slides: tuple[SlideSpec, ...]
+    # DataFrameParser types of the columns that differ from the detected ones
+    column_types: dict[str, str] = field(default_factory=dict)
+    width: int = 640
+    height: int = 320
+    tooltip: bool = True
+
+    @classmethod
+    def load(cls, spec_file: Path) -> StorySpec:
+        with open(spec_file, "r", encoding="utf8") as json_file:
+            raw = json.load(json_file)
+        return cls(
+            slides=tuple(SlideSpec.from_dict(slide) for slide in raw["slides"]),
+            column_types=dict(raw.get("column_types", {})),
+            width=raw.get("width", cls.width),
+            height=raw.get("height", cls.height),
+            tooltip=raw.get("tooltip", cls.tooltip),
+        )
+
+
+@dataclass(frozen=True)
+class StoryJob:
+    dataset: Path
+    spec: Path
+    output: Path
+
+    @property
+    def name(self) -> str:
+        return f"{self.dataset.stem}-{self.spec.stem}"
+
+
+@dataclass(frozen=True)
+class StoryResult:
+    job: StoryJob
+    seconds: float
+    slides: int = 0
+    nbytes: int = 0
+    error: str | None = None
+
+
+class StoryEngine:
+    # Builds stories without Streamlit, from the same presets, slide configs,
+    # compact story data and generated code as the app
+
+    COMPACT_DATA: bool = True
+    DATASETS: LruCache[str, pd.DataFrame] = LruCache(
+        max_size=8, max_bytes=1024**3, size_of=df_nbytes
+    )
+
+    def __init__(self, presets: PresetIndex | None = None) -> None:
+        self._presets = (
+            presets if presets is not None else PresetIndex.load(PRESETS_FILE)
+        )
+
+    def load(self, dataset: Path, column_types: dict[str, str]) -> pd.DataFrame:
+        content = dataset.read_bytes()
+        fingerprint = combine_hash(content_hash(content), sorted(column_types.items()))
+        df = self.DATASETS.get(fingerprint)
+        if df is None:
+            raw_df = DataFrameReader(dataset.name).read(content)
+            parser = DataFrameParser(raw_df, column_types=column_types)
+            df = parser.convert_dataframe()
+            self.DATASETS.put(fingerprint, df)
+        return df
+
+    def build(self, dataset: Path, spec: StorySpec) -> tuple[str, str]:
+        df = self.load(dataset, spec.column_types)
+        return self.render(df, dataset.name, spec)
+
+    def render(
+        self, df: pd.DataFrame, file_name: str, spec: StorySpec
+    ) -> tuple[str, str]:
+        # the story html and the python code that rebuilds it
+        slides, slides_code, columns, filter_columns = self._get_slides(spec)
+        story = Story(data=self._get_data(df, columns, filter_columns))
+        for slide in slides:
+            story.add_slide(slide)
+        story.set_size(spec.width, spec.height)
+        story.set_feature("tooltip", spec.tooltip)
+        code = SlideConfig.get_story_code(
+            file_name, df, (spec.width, spec.height), spec.tooltip, slides_code
+        )
+        return story.to_html(), code
+
+    def _get_slides(
+        self, spec: StorySpec
+    ) -> tuple[list[Slide], list[str], list[str], set[str]]:
+        slides = []
+        slides_code = []
+        columns: list[str] = []
+        filter_columns: set[str] = set()
+        for slide_spec in spec.slides:
+            whole_config = SlideConfig.process(self.get_config(slide_spec))
+            filters = slide_spec.filters.to_js()
+            slides.append(SlideConfig.create(filters, whole_config))
+            slides_code.append(SlideConfig.get_code(filters, whole_config))
+            channel_columns, slide_filter_columns = SlideConfig.get_columns(
+                filters, whole_config
+            )
+            columns += channel_columns + slide_filter_columns
+            filter_columns.update(slide_filter_columns)
+        return slides, slides_code, columns, filter_columns
+
+    def get_config(self, slide_spec: SlideSpec) -> dict:
+        return self._get_preset(slide_spec).bind(slide_spec.columns)
+
+    def _get_preset(self, slide_spec: SlideSpec) -> ChartPreset:
+        key = ", ".join(slot for slot in SLOTS if slot in slide_spec.columns)
+        presets = self._presets.get(key, ())
+        for preset in presets:
+            if preset.chart == slide_spec.chart:
+                return preset
+        charts = ", ".join(preset.chart for preset in presets)
+        raise ValueError(
+            f"no {slide_spec.chart!r} preset for {key!r}, available: {charts}"
+        )
+
+    def _get_data(
+        self, df: pd.DataFrame, columns: list[str], filter_columns: set[str]
+    ) -> Data:
+        if self.COMPACT_DATA:
+            columns = [c for c in dict.fromkeys(columns) if c in df.columns]
+            return CompactData.of(df, columns, filter_columns)
+        data = Data()
+        data.add_df(to_vizzu(df))
+        return data
+
+
+@cache
+def get_engine() -> StoryEngine:
+    # one engine per worker process, its datasets are reused across jobs
+    return StoryEngine()
+
+
+def run_job(job: StoryJob) -> StoryResult:
+    start = time.perf_counter()
+    try:
+        spec = StorySpec.load(job.spec)
+        story_html, code = get_engine().build(job.dataset, spec)
+        job.output.mkdir(parents=True, exist_ok=True)
+        (job.output / f"{job.name}.html").write_text(story_html, encoding="utf8")
+        (job.output / f"{job.name}.py").write_text(code, encoding="utf8")
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        return StoryResult(job, time.perf_counter() - start, error=repr(exc))
+    return StoryResult(
+        job, time.perf_counter() - start, len(spec.slides), len(story_html)
+    )
+
+
+def run_jobs(
+    jobs: Iterable[StoryJob], workers: int | None = None
+) -> Iterator[StoryResult]:
+    # jobs of the same dataset are sent to the same worker in chunks
+    jobs = sorted(jobs, key=lambda job: (str(job.dataset), str(job.spec)))
+    if workers == 1:
+        yield from map(run_job, jobs)
+        return
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(run_job, jobs, chunksize=chunksize)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build Vizzu stories (html and python code) from datasets "
+        "and story specs without the app."
+    )
+    parser.add_argument("datasets", nargs="+", type=Path)
+    parser.add_argument("--spec", action="append", type=Path, required=True)
+    parser.add_argument("--output", type=Path, default=Path("stories"))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    jobs = [
+        StoryJob(dataset, spec, args.output)
+        for dataset in args.datasets
+        for spec in args.spec
+    ]
+    start = time.perf_counter()
+    failed = 0
+    for result in run_jobs(jobs, args.workers):
+        if result.error is not None:
+            failed += 1
+            print(f"FAILED {result.job.name}: {result.error}", file=sys.stderr)
+        else:
+            print(
+                f"{result.job.name}: {result.slides} slides, "
+                f"{result.nbytes:,} bytes in {result.seconds:.2f}s"
+            )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(jobs) - failed} of {len(jobs)} stories in {elapsed:.2f}s "
+        f"({len(jobs) / elapsed:.1f} stories/s)"
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
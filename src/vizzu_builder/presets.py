@@ -0,0 +1,169 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping
+
+
+logger = logging.getLogger(__name__)
+
+PRESETS_FILE: Path = Path(__file__).parent / "config/presets.json"
+SLOTS: tuple[str, ...] = ("Cat1", "Cat2", "Value1", "Value2")
+DIMENSION_SLOTS: tuple[str, ...] = ("Cat1", "Cat2")
+CHANNELS: tuple[str, ...] = (
+    "coordSystem",
+    "geometry",
+    "x",
+    "y",
+    "color",
+    "lightness",
+    "size",
+    "noop",
+    "split",
+    "align",
+    "orientation",
+)
+RANGE: dict[str, str] = {"y_range_min": "min", "y_range_max": "max"}
+
+ConfigPath = tuple[str | int, ...]
+
+
+class PresetError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ChartPreset:
+    chart: str
+    # the chart config with the slot names as placeholders
+    template: Mapping[str, Any]
+    # positions of the slots in the template
+    slots: tuple[tuple[ConfigPath, str], ...]
+
+    @property
+    def roles(self) -> frozenset[str]:
+        return frozenset(slot for _, slot in self.slots)
+
+    @property
+    def is_scatter(self) -> bool:
+        # circles placed by a dimension on noop or size stand for single marks,
+        # e.g. the points of a scatter plot
+        return self.template.get("geometry") == "circle" and any(
+            path[0] in ("noop", "size") and slot in DIMENSION_SLOTS
+            for path, slot in self.slots
+        )
+
+    def bind(self, columns: Mapping[str, str | None]) -> dict:
+        # only the containers that hold a slot are copied
+        config = dict(self.template)
+        copied: dict[ConfigPath, Any] = {}
+        for path, slot in self.slots:
+            parent: Any = config
+            for depth in range(1, len(path)):
+                prefix = path[:depth]
+                if prefix not in copied:
+                    copied[prefix] = parent[path[depth - 1]].copy()
+                    parent[path[depth - 1]] = copied[prefix]
+                parent = copied[prefix]
+            parent[path[-1]] = columns.get(slot) or ""
+        return config
+
+    @classmethod
+    def compile(cls, raw: Mapping[str, Any]) -> ChartPreset:
+        chart = raw.get("chart")
+        if not isinstance(chart, str):
+            raise PresetError(f"preset without a chart name: {raw}")
+        template: dict[str, Any] = {}
+        slots: list[tuple[ConfigPath, str]] = []
+        for key, value in raw.items():
+            if key == "chart" or key in RANGE or value is None:
+                continue
+            if key not in CHANNELS:
+                raise PresetError(f"{chart}: unknown config key {key!r}")
+            path: ConfigPath = (key, "set") if key == "y" else (key,)
+            value = cls._compile_value(chart, value, path, slots)
+            template[key] = {"set": value} if key == "y" else value
+        for key, bound in RANGE.items():
+            value = raw.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, (int, float, str)):
+                raise PresetError(f"{chart}: invalid {key} {value!r}")
+            template.setdefault("y", {}).setdefault("range", {})[bound] = value
+        return cls(chart, template, tuple(slots))
+
+    @staticmethod
+    def _compile_value(
+        chart: str, value: Any, path: ConfigPath, slots: list[tuple[ConfigPath, str]]
+    ) -> Any:
+        values = value if isinstance(value, list) else [value]
+        for i, item in enumerate(values):
+            if not isinstance(item, (str, bool)):
+                raise PresetError(f"{chart}: invalid value {item!r} for {path[0]}")
+            if item in SLOTS:
+                slots.append((path + (i,) if isinstance(value, list) else path, item))
+        return list(value) if isinstance(value, list) else value
+
+
+class PresetIndex(Mapping[str, tuple[ChartPreset, ...]]):
+    # Presets compiled once, keyed by the column roles they use,
+    # e.g. "Cat1, Value1"
+
+    def __init__(self, presets: Mapping[str, tuple[ChartPreset, ...]]) -> None:
+        self._presets = presets
+
+    def __getitem__(self, key: str) -> tuple[ChartPreset, ...]:
+        return self._presets[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._presets)
+
+    def __len__(self) -> int:
+        return len(self._presets)
+
+    @classmethod
+    def load(cls, presets_file: Path, packs: Iterable[Path] = ()) -> PresetIndex:
+        presets: dict[str, list[ChartPreset]] = {}
+        cls._add_pack(presets, cls._read(presets_file))
+        for pack in packs:
+            # a broken extra pack is skipped, the built-in presets still load
+            try:
+                pack_presets: dict[str, list[ChartPreset]] = {}
+                cls._add_pack(pack_presets, cls._read(pack))
+            except (OSError, ValueError) as exc:
+                logger.warning("preset pack %s skipped: %s", pack, exc)
+                continue
+            for key, compiled in pack_presets.items():
+                presets.setdefault(key, []).extend(compiled)
+        return cls({key: tuple(compiled) for key, compiled in presets.items()})
+
+    @staticmethod
+    def _read(presets_file: Path) -> Any:
+        with open(presets_file, "r", encoding="utf8") as json_file:
+            return json.load(json_file)
+
+    @staticmethod
+    def _add_pack(presets: dict[str, list[ChartPreset]], raw: Any) -> None:
+        if not isinstance(raw, dict):
+            raise PresetError("a preset pack maps column roles to presets")
+        for key, raw_presets in raw.items():
+            roles = key.split(", ")
+            if not set(roles) <= set(SLOTS) or key != ", ".join(
+                slot for slot in SLOTS if slot in roles
+            ):
+                raise PresetError(f"invalid column roles {key!r}")
+            if not isinstance(raw_presets, list):
+                raise PresetError(f"{key}: a list of presets is expected")
+            for raw_preset in raw_presets:
+                if not isinstance(raw_preset, dict):
+                    raise PresetError(f"{key}: a preset is expected, got {raw_preset}")
+                preset = ChartPreset.compile(raw_preset)
+                if not preset.roles <= set(roles):
+                    raise PresetError(
+                        f"{preset.chart}: uses {sorted(preset.roles)} under {key}"
+                    )
+                presets.setdefault(key, []).append(preset)
@@ -0,0 +1,123 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+import gzip
+import threading
+import time
+
+import requests
+
+
+@dataclass(frozen=True)
+class ShareResult:
+    ok: bool
+    attempts: int
+    nbytes: int
+    status_code: int | None = None
+    error: str | None = None
+
+
+class StoryUploader:
+    URL: str = "http://127.0.0.1:5000/fileupload"
+    # connect and read timeouts in seconds
+    TIMEOUT: tuple[float, float] = (3.05, 30.0)
+    RETRIES: int = 3
+    BACKOFF: float = 0.5
+    # content coding of the request body, the file is always sent as html.
+    # Opt-in, for endpoints known to decode it, None sends the body as is.
+    COMPRESSION: str | None = None
+    # statuses of an endpoint that cannot decode the compressed body, it gets
+    # the plain body from then on
+    UNSUPPORTED: tuple[int, ...] = (400, 415)
+    WORKERS: int = 4
+    EXECUTOR: ThreadPoolExecutor = ThreadPoolExecutor(
+        max_workers=WORKERS, thread_name_prefix="story-share"
+    )
+
+    _local = threading.local()
+    _plain_urls: set[str] = set()
+
+    @classmethod
+    def submit(cls, story_html: str) -> Future[ShareResult]:
+        return cls.EXECUTOR.submit(cls.upload, story_html)
+
+    @classmethod
+    def upload(cls, story_html: str) -> ShareResult:
+        content = story_html.encode("utf8")
+        encoding = None if cls.URL in cls._plain_urls else cls.COMPRESSION
+        result = cls._post(content, encoding)
+        if (
+            not result.ok
+            and encoding is not None
+            and result.status_code in cls.UNSUPPORTED
+        ):
+            cls._plain_urls.add(cls.URL)
+            plain_result = cls._post(content, None)
+            return replace(
+                plain_result, attempts=result.attempts + plain_result.attempts
+            )
+        return result
+
+    @classmethod
+    def compress(cls, content: bytes, encoding: str) -> tuple[str, bytes]:
+        if encoding == "zstd":
+            try:
+                import zstandard  # type: ignore # pylint: disable=import-outside-toplevel
+
+                return "zstd", zstandard.ZstdCompressor().compress(content)
+            except ImportError:
+                pass
+        return "gzip", gzip.compress(content)
+
+    @classmethod
+    def _post(cls, content: bytes, encoding: str | None) -> ShareResult:
+        session = cls._get_session()
+        try:
+            request = session.prepare_request(
+                requests.Request(
+                    "POST",
+                    cls.URL,
+                    files={"file": ("story.html", content, "text/html")},
+                )
+            )
+        except requests.RequestException as exc:
+            # e.g. a URL without a scheme
+            return ShareResult(False, 1, 0, error=str(exc))
+        if encoding is not None and isinstance(request.body, bytes):
+            encoding, request.body = cls.compress(request.body, encoding)
+            request.headers["Content-Encoding"] = encoding
+            request.headers["Content-Length"] = str(len(request.body))
+        nbytes = len(request.body) if isinstance(request.body, bytes) else 0
+        error: str | None = None
+        status_code: int | None = None
+        for attempt in range(1, cls.RETRIES + 1):
+            try:
+                response = session.send(request, timeout=cls.TIMEOUT)
+                status_code = response.status_code
+                if response.ok:
+                    return ShareResult(True, attempt, nbytes, status_code)
+                error = f"{response.status_code} {response.reason}"
+                # client errors will not succeed on retry
+                if response.status_code < 500:
+                    break
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = str(exc)
+            except requests.RequestException as exc:
+                # invalid requests will not succeed on retry
+                error = str(exc)
+                break
+            if attempt < cls.RETRIES:
+                time.sleep(cls.BACKOFF * 2 ** (attempt - 1))
+        return ShareResult(False, attempt, nbytes, status_code, error)
+
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        # sessions keep the connections alive, one per worker thread
+        session: requests.Session | None = getattr(cls._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            cls._local.session = session
+        return session
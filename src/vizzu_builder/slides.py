@@ -0,0 +1,97 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import json
+import re
+
+from ipyvizzu import Config, Data
+from ipyvizzustory import Slide, Step
+import pandas as pd
+
+from .data.generator import DataCodeGenerator
+from .formatter import CodeFormatter
+
+
+# the column names of the filters, as JSON string literals
+FILTER_COLUMN = re.compile(r'record\[("(?:[^"\\]|\\.)*")\]')
+
+
+class SlideConfig:
+    # Story slides from chart configs, shared by the app and the headless engine
+
+    @staticmethod
+    def process(config: dict) -> dict:
+        whole_config = {}
+        whole_config["x"] = None if "x" not in config else config["x"]
+
+        y_set = config.get("y", {}).get("set", None)
+        y_range_min = config.get("y", {}).get("range", {}).get("min", "auto")
+        y_range_max = config.get("y", {}).get("range", {}).get("max", "auto")
+        whole_config["y"] = {
+            "set": y_set,
+            "range": {"min": y_range_min, "max": y_range_max},
+        }
+
+        whole_config["color"] = None if "color" not in config else config["color"]
+        whole_config["lightness"] = (
+            None if "lightness" not in config else config["lightness"]
+        )
+        whole_config["size"] = None if "size" not in config else config["size"]
+        whole_config["noop"] = None if "noop" not in config else config["noop"]
+
+        whole_config["split"] = False if "split" not in config else config["split"]
+        whole_config["align"] = "none" if "align" not in config else config["align"]
+
+        whole_config["coordSystem"] = config["coordSystem"]
+        whole_config["geometry"] = config["geometry"]
+        whole_config["orientation"] = (
+            "horizontal" if "orientation" not in config else config["orientation"]
+        )
+
+        return whole_config
+
+    @staticmethod
+    def create(filters: str | None, whole_config: dict) -> Slide:
+        return Slide(Step(Data.filter(filters), Config(whole_config)))
+
+    @staticmethod
+    def get_code(filters: str | None, whole_config: dict) -> str:
+        return f"story.add_slide(Slide(Step(Data.filter({filters!r}), Config({whole_config}))))"
+
+    @staticmethod
+    def get_columns(
+        filters: str | None, whole_config: dict
+    ) -> tuple[list[str], list[str]]:
+        columns = []
+        for key in ["x", "color", "lightness", "size", "noop"]:
+            columns.append(whole_config[key])
+        columns.append(whole_config["y"]["set"])
+        channel_columns: list[str] = []
+        for column in columns:
+            for item in column if isinstance(column, list) else [column]:
+                if item is not None and item not in channel_columns:
+                    channel_columns.append(item)
+        filter_columns = [
+            json.loads(column) for column in FILTER_COLUMN.findall(filters or "")
+        ]
+        return channel_columns, filter_columns
+
+    @staticmethod
+    def get_story_code(
+        file_name: str | None,
+        df: pd.DataFrame | None,
+        size: tuple[int, int],
+        tooltip: bool,
+        slides_code: list[str],
+    ) -> str:
+        code = []
+        code.append("import pandas as pd")
+        code.append("from ipyvizzu import Config, Data")
+        code.append("from ipyvizzustory import Story, Slide, Step")
+        code += DataCodeGenerator.get_data_code(file_name, df)
+        code.append("story = Story(data)")
+        code.append(f"story.set_size({size[0]}, {size[1]})")
+        code.append(f'story.set_feature("tooltip", {tooltip})\n')
+        unformatted_code = "\n".join(code + slides_code + ["\nstory.play()"])
+        return CodeFormatter.format(unformatted_code)
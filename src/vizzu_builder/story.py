@@ -2,43 +2,85 @@
 
 from __future__ import annotations
 
+from concurrent.futures import wait
+import hashlib
+import json
 import pandas as pd
-import black
 import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.components.v1 import html
 from streamlit_extras.row import row  # type: ignore
 from ipyvizzustory.env.st.story import Story
-from ipyvizzustory import Slide, Step
-from ipyvizzu import Config, Data
-import requests
+from ipyvizzu import Data
+from ipyvizzu.json import RawJavaScriptEncoder
 
-from .data.generator import DataCodeGenerator
+from .data.cache import LruCache
+from .data.compact import CompactData
+from .data.dtypes import to_vizzu
+from .data.shared import ResourceRegistry
+from .data.fingerprint import frame_hash
+from .slides import SlideConfig
+from .tracing import span, traced
 
 
-if "story_code" not in st.session_state:
-    st.session_state["story_code"] = []
+class StoryBuilder:
+    # pylint: disable=too-many-instance-attributes
 
+    # embed only the columns the slides use, pre-aggregated where possible
+    COMPACT_DATA: bool = True
+    HTML_CACHE: LruCache[str, str] = LruCache(
+        max_size=32, max_bytes=256 * 1024**2, size_of=len
+    )
+    # the story data of a dataset is built once and shared by the sessions
+    DATA: ResourceRegistry[str, Data] = ResourceRegistry()
+    # seconds a rendered page waits for a pending share to show its result
+    SHARE_POLL: float = 0.5
 
-class StoryBuilder:
-    def __init__(self, file_name: str | None, df: pd.DataFrame | None) -> None:
+    def __init__(
+        self,
+        file_name: str | None,
+        df: pd.DataFrame | None,
+        fingerprint: str | None = None,
+    ) -> None:
         self._file_name = file_name
         self._df = df
         self._width = 640
         self._height = 320
         self._start_slide = -1
         self._tooltip = True
+        self._share_status: DeltaGenerator | None = None
         if self._df is not None:
-            if "df" not in st.session_state:
-                st.session_state.df = self._df
-            if "story" not in st.session_state or not st.session_state.df.equals(
-                self._df
+            if fingerprint is None:
+                fingerprint = frame_hash(self._df)
+            if (
+                "story" not in st.session_state
+                or st.session_state.story_fingerprint != fingerprint
             ):
-                st.session_state.df = self._df
-                data = Data()
-                data.add_df(self._df)
-                st.session_state.story = Story(data=data)
+                st.session_state.story = Story(data=self._acquire_data(fingerprint))
+                st.session_state.story_fingerprint = fingerprint
+                st.session_state.story_tooltip = None
                 self.set_size(self._width, self._height)
                 self.set_start_slide(self._start_slide)
                 st.session_state.story_code = []
+                st.session_state.story_columns = []
+
+    def _acquire_data(self, fingerprint: str) -> Data:
+        if self.COMPACT_DATA:
+            # the exported stories embed their own compact data, the session
+            # story keeps the slides and only the series of the dataset
+            st.session_state.pop("story_data", None)
+            return self._get_data(rows=0)
+        data = self.DATA.acquire(fingerprint, self._get_data)
+        st.session_state.story_data = data
+        return data.value
+
+    @traced("story.data")
+    def _get_data(self, rows: int | None = None) -> Data:
+        data = Data()
+        if self._df is not None:
+            df = self._df if rows is None else self._df.head(rows)
+            data.add_df(to_vizzu(df))
+        return data
 
     def set_start_slide(self, index: int) -> None:
         if "story" in st.session_state:
@@ -50,17 +92,21 @@ class StoryBuilder:
 
     def set_tooltip(self, tooltip: bool) -> None:
         if "story" in st.session_state:
-            st.session_state.story.set_feature("tooltip", tooltip)
+            # set_feature appends, only add the feature when it changes
+            if st.session_state.story_tooltip != tooltip:
+                st.session_state.story.set_feature("tooltip", tooltip)
+                st.session_state.story_tooltip = tooltip
             self._tooltip = tooltip
 
     def add_slide(self, filters: str | None, config: dict) -> None:
         if "story" in st.session_state:
-            whole_config = self._process_config(config)
-            st.session_state.story.add_slide(
-                Slide(Step(Data.filter(filters), Config(whole_config)))
-            )
+            whole_config = SlideConfig.process(config)
+            st.session_state.story.add_slide(SlideConfig.create(filters, whole_config))
             st.session_state.story_code.append(
-                f'story.add_slide(Slide(Step(Data.filter("{filters}"), Config({whole_config}))))'
+                SlideConfig.get_code(filters, whole_config)
+            )
+            st.session_state.story_columns.append(
+                SlideConfig.get_columns(filters, whole_config)
             )
 
     @staticmethod
@@ -72,16 +118,23 @@ class StoryBuilder:
         ):
             st.session_state.story["slides"].pop()
             st.session_state.story_code.pop()
+            st.session_state.story_columns.pop()
 
+    @traced("story.play")
     def play(self) -> None:
         if "story" in st.session_state and st.session_state.story["slides"]:
             st.subheader("Create Story")
-            st.session_state.story.play()
+            html(
+                self._get_html(self._start_slide),
+                width=self._width,
+                height=self._height,
+            )
             rows = row(2)
             self._add_delete_button(rows)
             self._add_download_button(rows)
             self._add_share_button(rows)
             self._add_show_code_button()
+            self._wait_for_share()
 
     def _add_delete_button(self, rows) -> None:  # type: ignore
         if "story" in st.session_state and st.session_state.story["slides"]:
@@ -93,81 +146,131 @@ class StoryBuilder:
 
     def _add_download_button(self, rows) -> None:  # type: ignore
         if "story" in st.session_state:
-            self.set_start_slide(0)
             rows.download_button(
                 label="Download Story",
-                data=st.session_state.story.to_html(),
+                data=self._get_html(0),
                 file_name="story.html",
                 mime="text/html",
                 use_container_width=True,
             )
-            self.set_start_slide(self._start_slide)
 
-    def _add_share_button(self, rows) -> None:
+    def _get_html(self, start_slide: int) -> str:
+        key = self._get_html_key(start_slide)
+        story_html = self.HTML_CACHE.get(key)
+        if story_html is None:
+            with span("story.html") as current:
+                story = self._get_export_story()
+                story.start_slide = start_slide
+                story_html = story.to_html()
+                story.start_slide = self._start_slide
+                if current is not None:
+                    current.args["bytes"] = len(story_html)
+            self.HTML_CACHE.put(key, story_html)
+        return story_html
+
+    def _get_export_story(self) -> Story:
+        story: Story = st.session_state.story
+        if not self.COMPACT_DATA or self._df is None:
+            return story
+        columns: list[str] = []
+        filter_columns: set[str] = set()
+        for channel_columns, slide_filter_columns in st.session_state.story_columns:
+            columns += channel_columns + slide_filter_columns
+            filter_columns.update(slide_filter_columns)
+        columns = [c for c in dict.fromkeys(columns) if c in self._df.columns]
+        compact_story = Story(data=CompactData.of(self._df, columns, filter_columns))
+        compact_story["slides"] = story["slides"]
+        compact_story.set_size(self._width, self._height)
+        compact_story.set_feature("tooltip", self._tooltip)
+        return compact_story
+
+    def _get_html_key(self, start_slide: int) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(st.session_state.story_fingerprint.encode())
+        digest.update(
+            json.dumps(
+                [
+                    st.session_state.story["slides"],
+                    self._width,
+                    self._height,
+                    st.session_state.story_tooltip,
+                    start_slide,
+                ],
+                cls=RawJavaScriptEncoder,
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def _add_share_button(self, rows) -> None:  # type: ignore
         if "story" in st.session_state and st.session_state.story["slides"]:
             rows.button(
                 "Share Story",
                 use_container_width=True,
-                on_click=StoryBuilder.shareStory,
+                on_click=self.share_story,
             )
+            self._add_share_status()
 
-    def shareStory(self):
+    def share_story(self) -> None:
         if "story" in st.session_state:
-            file = {'file': st.session_state.story.to_html()}
-            response = requests.post("http://127.0.0.1:5000/fileupload", file=file)
+            # requests is only imported once a story is shared
+            # pylint: disable-next=import-outside-toplevel
+            from .share import StoryUploader
+
+            # the upload runs in the background, the status is shown on rerun
+            st.session_state.story_share = StoryUploader.submit(self._get_html(0))
+
+    def _add_share_status(self) -> None:
+        self._share_status = st.empty()
+        self._show_share_status()
+
+    def _show_share_status(self) -> None:
+        future = st.session_state.get("story_share")
+        if future is not None and self._share_status is not None:
+            if not future.done():
+                self._share_status.info("Sharing story...")
+            elif future.exception() is not None:
+                self._share_status.error(f"Sharing failed: {future.exception()}")
+            elif future.result().ok:
+                self._share_status.success(
+                    f"Story shared ({future.result().nbytes:,} bytes sent)"
+                )
+            else:
+                self._share_status.error(
+                    f"Sharing failed after {future.result().attempts} attempts: "
+                    f"{future.result().error}"
+                )
+
+    def _wait_for_share(self) -> None:
+        # nothing reruns the page when an upload finishes, a pending share is
+        # waited for briefly once the page is rendered, a longer one is shown
+        # on refresh or on the next interaction
+        future = st.session_state.get("story_share")
+        if future is None or self._share_status is None or future.done():
+            return
+        if wait([future], timeout=self.SHARE_POLL).done:
+            self._show_share_status()
+        else:
+            with self._share_status.container():
+                st.info("Sharing story...")
+                st.button("Refresh status", key="story_share_refresh")
 
     def _add_show_code_button(self) -> None:
         if "story" in st.session_state and st.session_state.story_code:
-            show_code = st.expander("Show code")
-            with show_code:
+            show_code = st.toggle("Show code", key="code_story")
+            if show_code:
                 st.code(
                     self._get_code(),
                     language="python",
                 )
 
+    @traced("story.code")
     def _get_code(self) -> str:
         if "story" in st.session_state and st.session_state.story_code:
-            code = []
-            code.append("import pandas as pd")
-            code.append("from ipyvizzu import Config, Data")
-            code.append("from ipyvizzustory import Story, Slide, Step")
-            code += DataCodeGenerator.get_data_code(self._file_name, self._df)
-            code.append("story = Story(data)")
-            code.append(f"story.set_size({self._width}, {self._height})")
-            code.append(f'story.set_feature("tooltip", {self._tooltip})\n')
-            unformatted_code = "\n".join(
-                code + st.session_state.story_code + ["\nstory.play()"]
+            return SlideConfig.get_story_code(
+                self._file_name,
+                self._df,
+                (self._width, self._height),
+                self._tooltip,
+                st.session_state.story_code,
             )
-            formatted_code = black.format_str(unformatted_code, mode=black.FileMode())
-            return formatted_code
         return ""
-
-    def _process_config(self, config: dict) -> dict:
-        whole_config = {}
-        whole_config["x"] = None if "x" not in config else config["x"]
-
-        y_set = config.get("y", {}).get("set", None)
-        y_range_min = config.get("y", {}).get("range", {}).get("min", "auto")
-        y_range_max = config.get("y", {}).get("range", {}).get("max", "auto")
-        whole_config["y"] = {
-            "set": y_set,
-            "range": {"min": y_range_min, "max": y_range_max},
-        }
-
-        whole_config["color"] = None if "color" not in config else config["color"]
-        whole_config["lightness"] = (
-            None if "lightness" not in config else config["lightness"]
-        )
-        whole_config["size"] = None if "size" not in config else config["size"]
-        whole_config["noop"] = None if "noop" not in config else config["noop"]
-
-        whole_config["split"] = False if "split" not in config else config["split"]
-        whole_config["align"] = "none" if "align" not in config else config["align"]
-
-        whole_config["coordSystem"] = config["coordSystem"]
-        whole_config["geometry"] = config["geometry"]
-        whole_config["orientation"] = (
-            "horizontal" if "orientation" not in config else config["orientation"]
-        )
-
-        return whole_config
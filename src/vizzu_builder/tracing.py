@@ -0,0 +1,232 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import cProfile
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+import io
+import json
+import marshal
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, ContextManager, Iterator, TypeVar, cast
+
+
+# Without it the traced functions are left undecorated and span() is a no-op
+ENABLED: bool = os.environ.get("VIZZU_BUILDER_TRACE", "") not in ("", "0")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_NOOP: nullcontext[None] = nullcontext()
+
+
+@dataclass
+class Span:
+    name: str
+    depth: int
+    # seconds since the start of the rerun
+    start: float
+    seconds: float = 0.0
+    # bytes allocated above the start of the span, at its peak and at its end,
+    # only when memory is traced
+    peak_bytes: int | None = None
+    net_bytes: int | None = None
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _OpenSpan:
+    span: Span
+    current: int = 0
+    # the peak of the parent before this span reset it
+    parent_peak: int = 0
+    # the highest peak of the children
+    children_peak: int = 0
+
+
+class RerunTrace:
+    # Spans of one script run of a session. The current trace is bound to
+    # the script thread, the spans of other sessions do not mix into it.
+
+    CURRENT: ContextVar[RerunTrace | None] = ContextVar("trace", default=None)
+    PROFILE_LIMIT: int = 40
+    # tracemalloc is process wide, the memory of concurrent reruns adds up
+    _MEMORY_LOCK = threading.Lock()
+    _memory_users: int = 0
+    _memory_owned: bool = False
+
+    def __init__(self, memory: bool = False, profile: bool = False) -> None:
+        self.spans: list[Span] = []
+        self._memory = memory
+        self._origin = time.perf_counter()
+        self._thread = threading.get_ident()
+        self._stack: list[_OpenSpan] = []
+        self._profiler = cProfile.Profile() if profile else None
+        self._profile_stats: pstats.Stats | None = None
+
+    @property
+    def seconds(self) -> float:
+        return self.spans[0].seconds if self.spans else 0.0
+
+    @property
+    def memory(self) -> bool:
+        return self._memory
+
+    @classmethod
+    @contextmanager
+    def start(
+        cls, memory: bool = False, profile: bool = False
+    ) -> Iterator[RerunTrace | None]:
+        if not ENABLED:
+            yield None
+            return
+        trace = cls(memory, profile)
+        token = cls.CURRENT.set(trace)
+        if memory:
+            cls._start_memory()
+        try:
+            with trace.span("rerun"), trace._profile():
+                yield trace
+        finally:
+            if memory:
+                cls._stop_memory()
+            cls.CURRENT.reset(token)
+
+    @classmethod
+    def _start_memory(cls) -> None:
+        with cls._MEMORY_LOCK:
+            if cls._memory_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                cls._memory_owned = True
+            cls._memory_users += 1
+
+    @classmethod
+    def _stop_memory(cls) -> None:
+        with cls._MEMORY_LOCK:
+            cls._memory_users -= 1
+            if cls._memory_users == 0 and cls._memory_owned:
+                tracemalloc.stop()
+                cls._memory_owned = False
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        new_span = Span(name, len(self._stack), time.perf_counter() - self._origin)
+        self.spans.append(new_span)
+        current = _OpenSpan(new_span)
+        if self._memory:
+            current.current, current.parent_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        self._stack.append(current)
+        try:
+            yield new_span
+        finally:
+            self._stack.pop()
+            new_span.seconds = time.perf_counter() - self._origin - new_span.start
+            if self._memory:
+                self._close_memory(current)
+
+    def _close_memory(self, current: _OpenSpan) -> None:
+        now, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, current.children_peak)
+        current.span.peak_bytes = max(0, peak - current.current)
+        current.span.net_bytes = now - current.current
+        if self._stack:
+            parent = self._stack[-1]
+            parent.children_peak = max(parent.children_peak, current.parent_peak, peak)
+
+    @contextmanager
+    def _profile(self) -> Iterator[None]:
+        if self._profiler is None:
+            yield
+            return
+        try:
+            self._profiler.enable()
+        except ValueError:
+            # another profiler is active
+            self._profiler = None
+            yield
+            return
+        try:
+            yield
+        finally:
+            self._profiler.disable()
+            self._profile_stats = pstats.Stats(self._profiler)
+
+    def get_profile_text(self) -> str | None:
+        if self._profile_stats is None:
+            return None
+        stream = io.StringIO()
+        self._profile_stats.stream = stream  # type: ignore
+        self._profile_stats.sort_stats("cumulative").print_stats(self.PROFILE_LIMIT)
+        return stream.getvalue()
+
+    def get_profile_data(self) -> bytes | None:
+        # in the format of pstats.Stats.dump_stats, e.g. for snakeviz
+        if self._profile_stats is None:
+            return None
+        return marshal.dumps(self._profile_stats.stats)  # type: ignore
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "seconds": self.seconds,
+                "memory": self._memory,
+                "spans": [asdict(span) for span in self.spans],
+            },
+            indent=2,
+            default=str,
+        )
+
+    def to_trace_events(self) -> str:
+        # Chrome trace event format, loads in chrome://tracing and Perfetto
+        pid = os.getpid()
+        events = []
+        for item in self.spans:
+            args = dict(item.args)
+            if item.peak_bytes is not None:
+                args["peak_bytes"] = item.peak_bytes
+                args["net_bytes"] = item.net_bytes
+            events.append(
+                {
+                    "name": item.name,
+                    "cat": "vizzu-builder",
+                    "ph": "X",
+                    "ts": item.start * 1e6,
+                    "dur": item.seconds * 1e6,
+                    "pid": pid,
+                    "tid": self._thread,
+                    "args": args,
+                }
+            )
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str)
+
+
+def span(name: str) -> ContextManager[Span | None]:
+    trace = RerunTrace.CURRENT.get() if ENABLED else None
+    if trace is None:
+        return _NOOP
+    return trace.span(name)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    def decorate(func: F) -> F:
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            trace = RerunTrace.CURRENT.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with trace.span(name):
+                return func(*args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorate
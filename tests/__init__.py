@@ -0,0 +1,7 @@
+# pylint: disable=missing-module-docstring
+
+from pathlib import Path
+import sys
+
+# the package is tested as the tools import it, from the src directory
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
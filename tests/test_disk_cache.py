@@ -0,0 +1,92 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from vizzu_builder.data.disk_cache import DiskCache
+
+
+def make_df(rows: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Genre": pd.Categorical(["Pop", "Rock"] * (rows // 2)),
+            "Plays": range(rows),
+        }
+    )
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_frames_round_trip(self) -> None:
+        cache = DiskCache(self.directory, 1024**2)
+        df = make_df(100)
+        cache.put("key", df)
+        cached = cache.get("key")
+        if cached is None:
+            self.fail("frame not cached")
+        pd.testing.assert_frame_equal(cached, df)
+
+    def test_frames_of_other_versions_are_not_served(self) -> None:
+        DiskCache(self.directory, 1024**2).put("key", make_df(100))
+        with mock.patch.object(DiskCache, "FORMAT", DiskCache.FORMAT + 1):
+            cache = DiskCache(self.directory, 1024**2)
+            self.assertIsNone(cache.get("key"))
+
+    def test_version_follows_the_sources(self) -> None:
+        version = DiskCache.get_version()
+        with mock.patch.object(Path, "read_bytes", return_value=b"changed"):
+            self.assertNotEqual(DiskCache.get_version(), version)
+
+    def test_least_recently_used_are_evicted(self) -> None:
+        df = make_df(1000)
+        cache = DiskCache(self.directory, 1024**2)
+        cache.put("first", df)
+        nbytes = cache.stats.nbytes
+        cache = DiskCache(self.directory, nbytes * 2)
+        cache.put("first", df)
+        cache.put("second", df)
+        for path in self.directory.iterdir():
+            os.utime(path, (1, 1) if "first" in path.name else None)
+        cache.put("third", df)
+        self.assertIsNone(cache.get("first"))
+        self.assertIsNotNone(cache.get("second"))
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_failed_removal_does_not_break_writes(self) -> None:
+        df = make_df(1000)
+        cache = DiskCache(self.directory, 1024**2)
+        cache.put("first", df)
+        cache = DiskCache(self.directory, cache.stats.nbytes)
+        with mock.patch.object(Path, "unlink", side_effect=PermissionError("denied")):
+            with self.assertLogs("vizzu_builder.data.disk_cache", "WARNING"):
+                cache.put("second", df)
+        self.assertEqual(cache.stats.evictions, 0)
+        self.assertIsNotNone(cache.get("second"))
+
+    def test_corrupt_frames_are_dropped(self) -> None:
+        cache = DiskCache(self.directory, 1024**2)
+        cache.put("key", make_df(100))
+        for path in self.directory.iterdir():
+            path.write_bytes(b"corrupt")
+        with self.assertLogs("vizzu_builder.data.disk_cache", "WARNING"):
+            self.assertIsNone(cache.get("key"))
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_frames_are_served_when_they_cannot_be_touched(self) -> None:
+        cache = DiskCache(self.directory, 1024**2)
+        cache.put("key", make_df(100))
+        with mock.patch("os.utime", side_effect=PermissionError("denied")):
+            self.assertIsNotNone(cache.get("key"))
+        self.assertEqual(len(list(self.directory.iterdir())), 1)
+        self.assertEqual(cache.stats.hits, 1)
@@ -0,0 +1,134 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from vizzu_builder.data.predicate import (
+    CategoricalPredicate,
+    DateRangePredicate,
+    FilterSpec,
+    Predicate,
+    TextPredicate,
+)
+from vizzu_builder.data.profile import DataFrameProfile
+from vizzu_builder.slides import SlideConfig
+
+NODE = shutil.which("node")
+CONFIG = {key: None for key in ["x", "color", "lightness", "size", "noop"]}
+
+
+def run_js(predicate: Predicate, records: list[dict]) -> list[bool]:
+    # the filter as the chart evaluates it, on the records
+    script = (
+        f"const records = {json.dumps(records)};\n"
+        f"console.log(JSON.stringify(records.map(record => {predicate.to_js()})));"
+    )
+    result = subprocess.run(
+        [str(NODE), "-e", script], capture_output=True, text=True, check=True
+    )
+    matches: list[bool] = json.loads(result.stdout)
+    return matches
+
+
+class TextPredicateTest(unittest.TestCase):
+    def test_missing_values_do_not_match(self) -> None:
+        column = pd.Series(["banana", None, np.nan, "nan"])
+        mask = TextPredicate("Fruit", "na").mask(column)
+        self.assertEqual(mask.tolist(), [True, False, False, True])
+
+    @unittest.skipUnless(NODE, "node is not installed")
+    def test_js_matches_the_mask(self) -> None:
+        values = ["c1", "c10", "c1d", "c2", "it's", "a\\b", 'say "hi"']
+        for pattern in [r"c1\d$", "c1d", "'", "\\", '"hi"', "it's$"]:
+            predicate = TextPredicate("Na'me", pattern)
+            records = [{"Na'me": value} for value in values]
+            self.assertEqual(
+                run_js(predicate, records),
+                predicate.mask(pd.Series(values)).tolist(),
+                pattern,
+            )
+
+
+class CategoricalPredicateTest(unittest.TestCase):
+    @unittest.skipUnless(NODE, "node is not installed")
+    def test_js_matches_the_mask(self) -> None:
+        values = ["it's", 'say "hi"', "a\\b", "other"]
+        predicate = CategoricalPredicate('Qu"ote', ("it's", 'say "hi"', "a\\b"))
+        records = [{'Qu"ote': value} for value in values]
+        self.assertEqual(
+            run_js(predicate, records),
+            predicate.mask(pd.Series(values)).tolist(),
+        )
+
+
+class DateRangePredicateTest(unittest.TestCase):
+    VALUES = [
+        "2023-01-04 23:59:59",
+        "2023-01-05 00:00:00",
+        "2023-01-05 13:30:00",
+        "2023-01-06 23:59:59",
+        "2023-01-07 00:00:00",
+        None,
+    ]
+    DATES = ["2023-01-04", "2023-01-05", "2023-01-06", "2023-01-07", None]
+    PREDICATE = DateRangePredicate(
+        "Date", pd.Timestamp("2023-01-05"), pd.Timestamp("2023-01-07")
+    )
+
+    def test_last_day_is_included_until_its_end(self) -> None:
+        column = pd.Series(self.VALUES)
+        expected = [False, True, True, True, False, False]
+        self.assertEqual(self.PREDICATE.mask(column).tolist(), expected)
+        df = pd.DataFrame({"Date": pd.to_datetime(column)})
+        spec = FilterSpec((self.PREDICATE,))
+        self.assertEqual(spec.count(df), sum(expected))
+        self.assertEqual(spec.mask(df).tolist(), expected)
+
+    def test_dates_parsed_by_the_profile_are_reused(self) -> None:
+        df = pd.DataFrame({"Date": self.VALUES})
+        DataFrameProfile.of(df, "dates").datetimes("Date")
+        with mock.patch("pandas.to_datetime", side_effect=AssertionError):
+            self.assertEqual(FilterSpec((self.PREDICATE,)).count(df, "dates"), 3)
+
+    @unittest.skipUnless(NODE, "node is not installed")
+    def test_js_matches_the_mask(self) -> None:
+        for values in [self.VALUES, self.DATES]:
+            records = [{"Date": value} for value in values]
+            for predicate in [
+                self.PREDICATE,
+                DateRangePredicate("Date", None, pd.Timestamp("2023-01-05 13:30")),
+                DateRangePredicate("Date", pd.Timestamp("2023-01-05 13:30"), None),
+            ]:
+                self.assertEqual(
+                    run_js(predicate, records),
+                    predicate.mask(pd.Series(values)).tolist(),
+                    (predicate, values),
+                )
+
+
+class SlideFilterTest(unittest.TestCase):
+    def test_filter_columns_are_found(self) -> None:
+        filters = FilterSpec(
+            (
+                TextPredicate("Na'me", r"c1\d$"),
+                CategoricalPredicate('Qu"ote', ("record['x']",)),
+            )
+        ).to_js()
+        _, filter_columns = SlideConfig.get_columns(
+            filters, {**CONFIG, "y": {"set": None}}
+        )
+        self.assertEqual(filter_columns, ["Na'me", 'Qu"ote'])
+
+    def test_code_keeps_the_filter(self) -> None:
+        filters = TextPredicate("Name", r"it's\d").to_js()
+        code = SlideConfig.get_code(filters, {})
+        self.assertIn(repr(filters), code)
+        compile(code, "slide", "exec")
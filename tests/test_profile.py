@@ -0,0 +1,104 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from vizzu_builder.data.parser import DataFrameParser
+from vizzu_builder.data.profile import DataFrameProfile
+
+
+class DatetimeProfileTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.df = pd.DataFrame(
+            {
+                "Date": ["2020-01-03", "2020-01-01", None, "2020-02-01"],
+                "Name": ["a", "b", "c", "d"],
+                "Missing": [None, None, None, None],
+                "Plays": [1, 2, 3, 4],
+            }
+        )
+        self.to_datetime = mock.patch(
+            "vizzu_builder.data.profile.pd.to_datetime", wraps=pd.to_datetime
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_ingest_does_not_parse_datetimes(self) -> None:
+        DataFrameParser(self.df, "ingest").convert_dataframe()
+        self.to_datetime.assert_not_called()
+
+    def test_columns_are_parsed_on_first_use(self) -> None:
+        profile = DataFrameProfile.of(self.df, "first use")
+        datetime_profile = profile.datetime_profile("Date")
+        if datetime_profile is None:
+            self.fail("Date is not parsed")
+        self.assertEqual(datetime_profile.min, pd.Timestamp("2020-01-01"))
+        self.assertEqual(datetime_profile.max, pd.Timestamp("2020-02-01"))
+        profile.datetimes("Date")
+        DataFrameProfile.of(self.df, "first use").datetime_profile("Date")
+        self.assertEqual(self.to_datetime.call_count, 1)
+
+    def test_unparseable_columns_are_parsed_once(self) -> None:
+        for _ in range(2):
+            profile = DataFrameProfile.of(self.df, "unparseable")
+            self.assertIsNone(profile.datetime_profile("Name"))
+            self.assertIsNone(profile.datetimes("Name"))
+            self.assertIsNone(profile.datetime_profile("Missing"))
+        self.assertEqual(self.to_datetime.call_count, 2)
+
+
+class NumericBoundsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.df = pd.DataFrame(
+            {
+                "Missing": [float("nan")] * 10_000,
+                "Skewed": [0.0] * 9_998 + [50.0] * 2,
+                "Plays": range(10_000),
+            }
+        )
+
+    def test_missing_values_have_no_bounds(self) -> None:
+        profile = DataFrameProfile.of(self.df, "exact bounds")["Missing"]
+        self.assertEqual((profile.min, profile.max), (None, None))
+
+    def test_approximate_bounds(self) -> None:
+        with mock.patch.object(DataFrameProfile, "APPROXIMATE_ROWS", 100):
+            profile = DataFrameProfile.of(self.df, "approximate bounds")
+            self.assertEqual(
+                (profile["Missing"].min, profile["Missing"].max), (None, None)
+            )
+            # the sampled quantiles of a skewed column are equal, the exact
+            # bounds are used instead
+            self.assertEqual((profile["Skewed"].min, profile["Skewed"].max), (0, 50))
+            self.assertTrue(profile["Plays"].is_approximate)
+            self.assertLess(profile["Plays"].min, profile["Plays"].max)
+
+    def test_approximate_columns_are_not_converted_whole(self) -> None:
+        df = self.df.assign(Code=self.df["Plays"].astype(str), Name="x")
+        with mock.patch.multiple(
+            DataFrameProfile, APPROXIMATE_ROWS=100, SAMPLE_ROWS=1000
+        ), mock.patch(
+            "pandas.Series.astype", autospec=True, side_effect=pd.Series.astype
+        ) as astype:
+            profile = DataFrameProfile.of(df, "approximate conversion")
+            self.assertTrue(profile["Plays"].is_float_convertible)
+            self.assertTrue(profile["Code"].is_float_convertible)
+            self.assertFalse(profile["Name"].is_float_convertible)
+        converted = [len(call.args[0]) for call in astype.call_args_list]
+        self.assertNotIn(len(df), converted)
+
+    def test_measures_offered_from_a_sample_convert(self) -> None:
+        codes = self.df["Plays"].astype(str).where(self.df["Plays"] != 5, "x")
+        df = self.df.assign(Code=codes)
+        with mock.patch.multiple(
+            DataFrameProfile, APPROXIMATE_ROWS=100, SAMPLE_ROWS=1000
+        ):
+            profile = DataFrameProfile.of(df, "sampled measures")
+            self.assertTrue(profile["Code"].is_float_convertible)
+            converted = DataFrameParser(
+                df, "sampled measures", {"Code": DataFrameParser.MEASURE}
+            ).convert_dataframe()
+        self.assertEqual(converted["Code"].isna().sum(), 1)
@@ -0,0 +1,44 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from vizzu_builder.data.reader import DataFrameReader
+
+
+def to_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode()
+
+
+class DataFrameReaderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.object(DataFrameReader, "CHUNK_SIZE", 100)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_type_change_across_chunks(self) -> None:
+        codes = [str(i % 50) for i in range(250)]
+        codes[150] = "x"
+        content = to_csv(pd.DataFrame({"Code": codes, "Plays": range(250)}))
+        df = DataFrameReader("data.csv").read(content)
+        self.assertEqual({type(value) for value in df["Code"]}, {str})
+        self.assertEqual(df["Code"].tolist(), codes)
+        self.assertEqual(df["Code"].nunique(), 51)
+        self.assertEqual(df["Plays"].dtype, "int64")
+
+    def test_numbers_across_chunks_stay_numbers(self) -> None:
+        values = [str(i) for i in range(250)]
+        values[150] = ""
+        content = to_csv(pd.DataFrame({"Value": values}))
+        df = DataFrameReader("data.csv").read(content)
+        self.assertEqual(df["Value"].dtype, "float64")
+
+    def test_sampled_rows_keep_their_order(self) -> None:
+        content = to_csv(pd.DataFrame({"Row": range(1000)}))
+        df = DataFrameReader("data.csv", sample=0.3).read(content)
+        self.assertTrue(df["Row"].is_monotonic_increasing)
+        self.assertLess(len(df), 1000)
@@ -0,0 +1,55 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import unittest
+import warnings
+
+import pandas as pd
+
+from vizzu_builder.data.reducer import DataFrameReducer
+
+
+class DataFrameReducerTest(unittest.TestCase):
+    @staticmethod
+    def _reduce(df: pd.DataFrame, max_categories: int) -> pd.DataFrame:
+        # the frames of a test are not told apart by the key
+        DataFrameReducer.CACHE.clear()
+        reduction = DataFrameReducer.reduce(
+            "test",
+            lambda: df,
+            ["City", "Kind"],
+            ["Count"],
+            max_categories=max_categories,
+        )
+        return reduction.df
+
+    def test_unused_categories_are_not_marks(self) -> None:
+        cities = [f"city {i}" for i in range(60)]
+        df = pd.DataFrame(
+            {
+                "City": pd.Categorical(cities * 3),
+                "Kind": pd.Categorical(["A"] * 60 + ["B"] * 60 + ["C"] * 60),
+                "Count": range(180),
+            }
+        )
+        filtered = df[df["Kind"] == "A"]
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FutureWarning)
+            reduced = self._reduce(filtered, max_categories=50)
+        self.assertEqual(len(reduced), 51)
+        self.assertEqual(set(reduced["Kind"]), {"A"})
+        self.assertEqual(reduced["Count"].sum(), filtered["Count"].sum())
+
+    def test_never_more_rows_than_input(self) -> None:
+        df = pd.DataFrame(
+            {
+                "City": pd.Categorical([f"city {i % 80}" for i in range(200)]),
+                "Kind": pd.Categorical([f"kind {i % 7}" for i in range(200)]),
+                "Count": range(200),
+            }
+        )
+        for max_categories in (1, 5, 50, 100):
+            for rows in (df, df.iloc[::3], df[df["Kind"] == "kind 0"]):
+                reduced = self._reduce(rows, max_categories)
+                self.assertLessEqual(len(reduced), len(rows))
@@ -0,0 +1,182 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from email.parser import BytesParser
+from email.policy import HTTP
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import socket
+import threading
+from typing import Any
+import unittest
+from unittest import mock
+
+from vizzu_builder.share import StoryUploader
+
+STORY = "<html>" + "story " * 1000 + "</html>"
+
+
+@dataclass(frozen=True)
+class Upload:
+    headers: dict[str, str]
+    body: bytes
+
+    def get_file(self) -> tuple[str | None, str, bytes]:
+        # the file name, type and content of the multipart body
+        body = self.body
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+        message = BytesParser(policy=HTTP).parsebytes(header + body)
+        part = next(message.iter_parts())
+        content = part.get_payload(decode=True)
+        if not isinstance(content, bytes):
+            raise ValueError("no file content")
+        return part.get_filename(), part.get_content_type(), content
+
+
+class Endpoint(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        # statuses to answer in order, then 200
+        self.statuses: list[int] = []
+        self.decodes = True
+        self.stall = threading.Event()
+        self.stalls = False
+        self.uploads: list[Upload] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/fileupload"
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: Endpoint
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.uploads.append(Upload(dict(self.headers.items()), body))
+        if self.server.stalls:
+            self.server.stall.wait(5)
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if not self.server.decodes and "Content-Encoding" in self.headers:
+            status = 415
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        # pylint: disable=redefined-builtin
+        pass
+
+
+class StoryUploaderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.endpoint = Endpoint()
+        threading.Thread(target=self.endpoint.serve_forever, daemon=True).start()
+        self.addCleanup(self.endpoint.server_close)
+        self.addCleanup(self.endpoint.shutdown)
+        self.addCleanup(self.endpoint.stall.set)
+        self.sleep = self._patch(mock.patch("time.sleep"))
+        self._patch(mock.patch.object(StoryUploader, "URL", self.endpoint.url))
+
+    def _patch(self, patcher: Any) -> Any:
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_story_is_sent_as_plain_html_by_default(self) -> None:
+        result = StoryUploader.upload(STORY)
+        self.assertTrue(result.ok)
+        upload = self.endpoint.uploads[0]
+        self.assertNotIn("Content-Encoding", upload.headers)
+        self.assertEqual(upload.get_file(), ("story.html", "text/html", STORY.encode()))
+
+    def test_story_is_sent_compressed_as_html(self) -> None:
+        self._patch(mock.patch.object(StoryUploader, "COMPRESSION", "gzip"))
+        result = StoryUploader.upload(STORY)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 1)
+        upload = self.endpoint.uploads[0]
+        self.assertEqual(upload.headers["Content-Encoding"], "gzip")
+        self.assertEqual(result.nbytes, len(upload.body))
+        self.assertLess(result.nbytes, len(STORY))
+        self.assertEqual(upload.get_file(), ("story.html", "text/html", STORY.encode()))
+
+    def test_plain_html_when_compression_is_not_supported(self) -> None:
+        self._patch(mock.patch.object(StoryUploader, "COMPRESSION", "gzip"))
+        self.endpoint.decodes = False
+        result = StoryUploader.upload(STORY)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 2)
+        self.assertNotIn("Content-Encoding", self.endpoint.uploads[1].headers)
+        self.assertEqual(
+            self.endpoint.uploads[1].get_file(),
+            ("story.html", "text/html", STORY.encode()),
+        )
+        # the endpoint is remembered, the next share is sent plain at once
+        self.assertEqual(StoryUploader.upload(STORY).attempts, 1)
+        self.assertEqual(len(self.endpoint.uploads), 3)
+
+    def test_server_errors_are_retried_with_backoff(self) -> None:
+        self.endpoint.statuses = [503, 502]
+        result = StoryUploader.upload(STORY)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 3)
+        self.assertEqual(
+            [call.args[0] for call in self.sleep.call_args_list],
+            [StoryUploader.BACKOFF, StoryUploader.BACKOFF * 2],
+        )
+
+    def test_retries_are_bounded(self) -> None:
+        self.endpoint.statuses = [500] * 10
+        result = StoryUploader.upload(STORY)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.attempts, StoryUploader.RETRIES)
+        self.assertEqual(result.status_code, 500)
+        self.assertEqual(len(self.endpoint.uploads), StoryUploader.RETRIES)
+
+    def test_client_errors_are_not_retried(self) -> None:
+        self.endpoint.statuses = [404]
+        result = StoryUploader.upload(STORY)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.attempts, 1)
+        self.assertEqual(result.error, "404 Not Found")
+
+    def test_stalled_endpoint_times_out(self) -> None:
+        self.endpoint.stalls = True
+        with mock.patch.object(StoryUploader, "TIMEOUT", (1.0, 0.2)):
+            result = StoryUploader.upload(STORY)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.attempts, StoryUploader.RETRIES)
+        self.assertIsNone(result.status_code)
+        self.assertIn("timed out", str(result.error))
+
+    def test_unreachable_endpoint_fails(self) -> None:
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            port = closed.getsockname()[1]
+        with mock.patch.object(StoryUploader, "URL", f"http://127.0.0.1:{port}/"):
+            result = StoryUploader.upload(STORY)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.attempts, StoryUploader.RETRIES)
+        self.assertIsNotNone(result.error)
+
+    def test_submit_uploads_in_the_background(self) -> None:
+        self.endpoint.stalls = True
+        future = StoryUploader.submit(STORY)
+        self.assertFalse(future.done())
+        self.endpoint.stall.set()
+        self.assertTrue(future.result(timeout=5).ok)
+
+    def test_invalid_url_fails_without_raising(self) -> None:
+        for url in ["127.0.0.1:5000/fileupload", "ftp://127.0.0.1/fileupload"]:
+            with mock.patch.object(StoryUploader, "URL", url):
+                result = StoryUploader.submit(STORY).result(timeout=5)
+            self.assertFalse(result.ok, url)
+            self.assertEqual(result.attempts, 1, url)
+            self.assertIsNotNone(result.error, url)
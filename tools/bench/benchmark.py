@@ -0,0 +1,325 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+from io import BytesIO
+import json
+from pathlib import Path
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "src"))
+
+# pylint: disable=wrong-import-position
+from vizzu_builder.data.aggregator import DataFrameAggregator
+from vizzu_builder.data.fingerprint import frame_hash
+from vizzu_builder.data.parser import DataFrameParser
+from vizzu_builder.data.payload import SerializedData
+from vizzu_builder.data.predicate import (
+    CategoricalPredicate,
+    ColumnMasks,
+    DateRangePredicate,
+    FilterSpec,
+    NumericRangePredicate,
+    TextPredicate,
+)
+from vizzu_builder.data.profile import DataFrameProfile
+from vizzu_builder.data.reader import DataFrameReader
+from vizzu_builder.data.reducer import DataFrameReducer
+from vizzu_builder.formatter import CodeFormatter
+from vizzu_builder.headless import SlideSpec, StoryEngine, StorySpec
+from vizzu_builder.presets import PRESETS_FILE, SLOTS, PresetIndex
+from vizzu_builder.slides import SlideConfig
+
+
+# dimension columns from a handful of values to nearly one value per row
+REGIONS: int = 8
+PRODUCTS: int = 200
+CUSTOMER_RATIO: float = 0.1
+CODES: int = 50
+DAYS: int = 3 * 365
+
+
+def generate(rows: int, seed: int = 0) -> pd.DataFrame:
+    # A sales-like table: text dimensions of low, medium and high cardinality,
+    # date strings, a numeric code and two measures
+    rng = np.random.default_rng(seed)
+    customers = max(1, int(rows * CUSTOMER_RATIO))
+    # products are skewed so that a few of them cover most of the rows
+    product_weights = 1 / np.arange(1, PRODUCTS + 1)
+    product_weights /= product_weights.sum()
+    regions = np.array([f"Region {i}" for i in range(REGIONS)], dtype=object)
+    products = np.array([f"Product {i:03d}" for i in range(PRODUCTS)], dtype=object)
+    dates = pd.date_range("2021-01-01", periods=DAYS, freq="D").strftime("%Y-%m-%d")
+    return pd.DataFrame(
+        {
+            "Region": regions[rng.integers(0, REGIONS, rows)],
+            "Product": products[rng.choice(PRODUCTS, rows, p=product_weights)],
+            "Customer": np.char.add("C", rng.integers(0, customers, rows).astype(str)),
+            "Date": np.asarray(dates)[rng.integers(0, DAYS, rows)],
+            "Code": rng.integers(1, CODES + 1, rows),
+            "Quantity": rng.integers(1, 101, rows),
+            "Price": np.round(rng.lognormal(3, 1, rows), 2),
+        }
+    )
+
+
+def to_bytes(df: pd.DataFrame, file_format: str) -> bytes:
+    if file_format == "parquet":
+        buffer = BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return df.to_csv(index=False).encode()
+
+
+SIZES: tuple[int, ...] = (1_000, 10_000, 100_000, 1_000_000)
+# smaller stages are within the noise of the timer and the allocator
+MIN_SECONDS: float = 0.05
+MIN_PEAK_MB: float = 5.0
+COLUMNS: dict[str, str] = {
+    "Cat1": "Region",
+    "Cat2": "Product",
+    "Value1": "Quantity",
+    "Value2": "Price",
+}
+STORY = StorySpec(
+    slides=(
+        SlideSpec("Column Chart", {"Cat1": "Region", "Value1": "Price"}),
+        SlideSpec(
+            "Stacked Column Chart",
+            {"Cat1": "Region", "Cat2": "Product", "Value1": "Price"},
+            FilterSpec((NumericRangePredicate("Quantity", 10, 90),)),
+        ),
+        SlideSpec(
+            "Bar Chart",
+            {"Cat1": "Product", "Value1": "Quantity"},
+            FilterSpec((CategoricalPredicate("Region", ("Region 0", "Region 1")),)),
+        ),
+    )
+)
+
+
+@dataclass
+class Measurement:
+    stage: str
+    rows: int
+    repeat: int
+    # seconds of the cold runs, the caches are cleared before each
+    best: float
+    median: float
+    # peak of the traced allocations of one more run
+    peak_mb: float
+
+
+@dataclass
+class Inputs:
+    rows: int
+    content: bytes
+    file_name: str
+    raw_df: pd.DataFrame
+    df: pd.DataFrame
+
+
+def clear_caches() -> None:
+    for cache in (
+        DataFrameProfile.CACHE,
+        DataFrameProfile.DATETIMES,
+        DataFrameProfile.DATETIME_PROFILES,
+        ColumnMasks.MASKS,
+        ColumnMasks.CODES,
+        ColumnMasks.INDEXES,
+        DataFrameAggregator.CACHE,
+        DataFrameReducer.CACHE,
+        SerializedData.CACHE,
+        CodeFormatter.CACHE,
+        StoryEngine.DATASETS,
+    ):
+        cache.clear()
+
+
+def ingest(inputs: Inputs) -> Any:
+    return DataFrameReader(inputs.file_name).read(inputs.content)
+
+
+def parse(inputs: Inputs) -> Any:
+    return DataFrameParser(inputs.raw_df).convert_dataframe()
+
+
+def filtering(inputs: Inputs) -> Any:
+    # what the filter widgets compute: the column profiles, the parsed dates,
+    # the row count of the selection and the filtered frame
+    df = inputs.df
+    fingerprint = frame_hash(df)
+    profile = DataFrameProfile.of(df, fingerprint)
+    for column in df.columns:
+        _ = profile[column]
+    # the date range is indexed from the dates parsed by the profile
+    _ = profile.datetime_profile("Date")
+    spec = FilterSpec(
+        (
+            CategoricalPredicate("Region", ("Region 0", "Region 1", "Region 2")),
+            NumericRangePredicate("Price", 10.0, 100.0),
+            DateRangePredicate(
+                "Date", pd.Timestamp("2022-01-01"), pd.Timestamp("2023-01-01")
+            ),
+            TextPredicate("Customer", "C1"),
+        )
+    )
+    return spec.count(df, fingerprint), spec.apply(df, fingerprint)
+
+
+def presets(inputs: Inputs) -> Any:
+    # every preset of every role combination bound to the columns
+    del inputs
+    index = PresetIndex.load(PRESETS_FILE)
+    configs = []
+    for key, chart_presets in index.items():
+        columns = {slot: COLUMNS[slot] for slot in SLOTS if slot in key.split(", ")}
+        configs += [preset.bind(columns) for preset in chart_presets]
+    return configs
+
+
+def code(inputs: Inputs) -> Any:
+    slides_code = []
+    engine = StoryEngine()
+    for slide_spec in STORY.slides:
+        whole_config = SlideConfig.process(engine.get_config(slide_spec))
+        slides_code.append(
+            SlideConfig.get_code(slide_spec.filters.to_js(), whole_config)
+        )
+    return SlideConfig.get_story_code(
+        inputs.file_name, inputs.df, (STORY.width, STORY.height), True, slides_code
+    )
+
+
+def story(inputs: Inputs) -> Any:
+    return StoryEngine().render(inputs.df, inputs.file_name, STORY)
+
+
+# the stages that do not depend on the rows run on the smallest frame only
+STAGES: dict[str, tuple[Callable[[Inputs], Any], bool]] = {
+    "ingest": (ingest, True),
+    "parse": (parse, True),
+    "filter": (filtering, True),
+    "presets": (presets, False),
+    "code": (code, False),
+    "story": (story, True),
+}
+
+
+def measure(name: str, inputs: Inputs, repeat: int) -> Measurement:
+    stage, _ = STAGES[name]
+    seconds = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        stage(inputs)
+        seconds.append(time.perf_counter() - start)
+    clear_caches()
+    tracemalloc.start()
+    stage(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Measurement(
+        name, inputs.rows, repeat, min(seconds), statistics.median(seconds), peak / 1e6
+    )
+
+
+def prepare(rows: int, file_format: str) -> Inputs:
+    content = to_bytes(generate(rows), file_format)
+    file_name = f"bench.{file_format}"
+    raw_df = DataFrameReader(file_name).read(content)
+    df = DataFrameParser(raw_df).convert_dataframe()
+    return Inputs(rows, content, file_name, raw_df, df)
+
+
+def compare(
+    results: list[Measurement], baseline: dict[str, Any], tolerance: float
+) -> bool:
+    previous = {(item["stage"], item["rows"]): item for item in baseline["results"]}
+    regressed = False
+    print(f"\n{'stage':<8} {'rows':>10} {'time':>8} {'memory':>8}")
+    for result in results:
+        item = previous.get((result.stage, result.rows))
+        if item is None:
+            continue
+        time_ratio = result.best / item["best"] if item["best"] else 1.0
+        if max(result.best, item["best"]) < MIN_SECONDS:
+            time_ratio = 1.0
+        memory_ratio = result.peak_mb / item["peak_mb"] if item["peak_mb"] else 1.0
+        if max(result.peak_mb, item["peak_mb"]) < MIN_PEAK_MB:
+            memory_ratio = 1.0
+        flag = ""
+        if time_ratio > tolerance or memory_ratio > tolerance:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{result.stage:<8} {result.rows:>10,} {time_ratio:>7.2f}x "
+            f"{memory_ratio:>7.2f}x{flag}"
+        )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time the data, chart and story stages on synthetic datasets."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--save", type=Path, help="write the results as a baseline")
+    parser.add_argument("--baseline", type=Path, help="compare to a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    # e.g. the sampling notice of ipyvizzu on large record filtered stories
+    warnings.simplefilter("ignore", UserWarning)
+    names = args.stages or list(STAGES)
+    sizes = sorted(args.sizes)
+    results = []
+    print(f"{'stage':<8} {'rows':>10} {'best':>9} {'median':>9} {'peak':>10}")
+    for rows in sizes:
+        inputs = prepare(rows, args.format)
+        for name in names:
+            if not STAGES[name][1] and rows != sizes[0]:
+                continue
+            result = measure(name, inputs, args.repeat)
+            results.append(result)
+            print(
+                f"{result.stage:<8} {result.rows:>10,} {result.best:>8.3f}s "
+                f"{result.median:>8.3f}s {result.peak_mb:>7.1f} MB"
+            )
+
+    if args.save is not None:
+        args.save.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "pandas": pd.__version__,
+                    "machine": platform.machine(),
+                    "format": args.format,
+                    "results": [asdict(result) for result in results],
+                },
+                indent=2,
+            ),
+            encoding="utf8",
+        )
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf8"))
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import re
+import subprocess
+import sys
+
+
+ROOT = Path(__file__).parents[2]
+PACKAGE = "src.vizzu_builder"
+# imported once charts, code, slides or a share are requested, not on start
+DEFERRED: tuple[str, ...] = (
+    "black",
+    "ipyvizzu",
+    "ipyvizzustory",
+    "streamlit_vizzu",
+    "streamlit_extras",
+    "requests",
+    "IPython",
+    "pyarrow.parquet",
+)
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def measure(runs: int) -> tuple[dict[str, int], set[str]]:
+    # best cumulative microseconds of the package and its direct imports over
+    # the runs, every run is a fresh interpreter without bytecode writes
+    best: dict[str, int] = {}
+    modules: set[str] = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-B", "-c", f"import {PACKAGE}"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # the imports of a module are listed before it, one level deeper
+        children: dict[str, int] = {}
+        for match in LINE.finditer(result.stderr):
+            _, cumulative, indent, name = match.groups()
+            modules.add(name)
+            if len(indent) == 2:
+                children[name] = int(cumulative)
+            elif not indent:
+                if name == PACKAGE:
+                    children[name] = int(cumulative)
+                    for child, value in children.items():
+                        best[child] = min(best.get(child, value), value)
+                children = {}
+    return best, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=f"Check the import time of {PACKAGE} with -X importtime."
+    )
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    best, modules = measure(args.runs)
+    total = best.get(PACKAGE, 0) / 1000
+    for name, cumulative in sorted(best.items(), key=lambda item: -item[1])[:10]:
+        print(f"{cumulative / 1000:>9.1f} ms  {name}")
+    failures = []
+    eager = sorted(name for name in DEFERRED if name in modules)
+    if eager:
+        failures.append(f"imported on start: {', '.join(eager)}")
+    if total > args.budget_ms:
+        failures.append(f"{PACKAGE} took {total:.0f} ms, over {args.budget_ms:.0f} ms")
+    if failures:
+        raise RuntimeError("; ".join(failures))
+
+
+main()
@@ -0,0 +1,238 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+from unittest.mock import MagicMock
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import (
+    MemoryCacheStorageManager,
+)
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test
+
+ROOT = Path(__file__).parents[2]
+sys.path.insert(0, str(ROOT))
+
+# The app as app.py starts it, with the sample data replaced by the dataset
+# under test, AppTest cannot drive the file uploader
+SCRIPT = """
+from src.vizzu_builder import App
+from src.vizzu_builder.data.loader import CsvFileUploader
+
+CsvFileUploader.SAMPLE_DATA = {data!r}
+App()
+"""
+
+
+class SessionRuntime(Runtime):
+    # AppTest installs a mock runtime for each run and removes it afterwards,
+    # which breaks the runs of the other sessions. The runs set it on this
+    # subclass instead, every session uses the one installed by share_runtime.
+    pass
+
+
+def share_runtime() -> None:
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime  # pylint: disable=protected-access
+    app_test.Runtime = SessionRuntime  # type: ignore
+
+
+@dataclass
+class SessionResult:
+    # seconds of the reruns by step
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+    app: AppTest | None = None
+
+
+def widget(elements: Any, label: str) -> Any:
+    for element in elements:
+        if element.label.startswith(label):
+            return element
+    raise LookupError(f"no widget {label!r}")
+
+
+def open_app(app: AppTest) -> None:
+    app.run()
+
+
+def upload(app: AppTest) -> None:
+    widget(app.toggle, "Use sample data").set_value(True).run()
+
+
+def set_types(app: AppTest) -> None:
+    # switches the first convertible column to the other type, a new dataset
+    selectbox = widget(app.selectbox, "Set type for")
+    other = [option for option in selectbox.options if option != selectbox.value]
+    selectbox.set_value(other[0]).run()
+
+
+def reset_types(app: AppTest) -> None:
+    selectbox = widget(app.selectbox, "Set type for")
+    selectbox.set_value(selectbox.options[1 - selectbox.index]).run()
+
+
+def open_filters(app: AppTest) -> None:
+    widget(app.toggle, "Add filters").set_value(True).run()
+
+
+def pick_filter_columns(app: AppTest) -> None:
+    multiselect = widget(app.multiselect, "Filter dataframe on")
+    multiselect.set_value(multiselect.options[:2]).run()
+
+
+def apply_filters(app: AppTest) -> None:
+    widget(app.button, "Update data").click().run()
+
+
+def pick_columns(app: AppTest) -> None:
+    selectbox = widget(app.selectbox, "Select Category 2")
+    if len(selectbox.options) > 1:
+        selectbox.set_value(selectbox.options[1])
+    widget(app.button, "Update charts").click().run()
+
+
+def add_slide(app: AppTest) -> None:
+    widget(app.button, "Add Chart to Story").click().run()
+
+
+def download(app: AppTest) -> None:
+    # the download button carries the story html, it is rendered on every
+    # rerun, AppTest cannot click it
+    app.run()
+    widget(app.get("download_button"), "Download Story")
+
+
+def get_flow(slides: int) -> list[tuple[str, Callable[[AppTest], None]]]:
+    return [
+        ("open", open_app),
+        ("upload", upload),
+        ("types", set_types),
+        ("types", reset_types),
+        ("filter", open_filters),
+        ("filter", pick_filter_columns),
+        ("filter", apply_filters),
+        ("columns", pick_columns),
+        *[("slide", add_slide)] * slides,
+        ("download", download),
+    ]
+
+
+def run_session(script: Path, slides: int, timeout: float) -> SessionResult:
+    result = SessionResult()
+    app = AppTest.from_file(str(script), default_timeout=timeout)
+    for step, action in get_flow(slides):
+        start = time.perf_counter()
+        try:
+            action(app)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            result.errors.append(f"{step}: {exc!r}")
+            break
+        result.latencies.setdefault(step, []).append(time.perf_counter() - start)
+        if app.exception:
+            result.errors.append(f"{step}: {app.exception.values[0]}")
+            break
+    # the session is kept alive so that its state counts into the memory
+    result.app = app
+    return result
+
+
+def get_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", "r", encoding="utf8") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() / 1024**2
+    except OSError:
+        return get_peak_rss_mb()
+
+
+def get_peak_rss_mb() -> float:
+    # kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(
+    results: list[SessionResult], elapsed: float, baseline: float, sessions: int
+) -> None:
+    latencies: dict[str, list[float]] = {}
+    for result in results:
+        for step, seconds in result.latencies.items():
+            latencies.setdefault(step, []).extend(seconds)
+    everything = [seconds for values in latencies.values() for seconds in values]
+    print(f"{'step':<10} {'reruns':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for step, values in [*latencies.items(), ("all", everything)]:
+        if values:
+            print(
+                f"{step:<10} {len(values):>7} {percentile(values, 0.5):>7.3f}s "
+                f"{percentile(values, 0.95):>7.3f}s {percentile(values, 0.99):>7.3f}s "
+                f"{max(values):>7.3f}s"
+            )
+    rss = get_rss_mb()
+    failed = [result for result in results if result.errors]
+    print(f"\nsessions:    {sessions} ({len(failed)} failed)")
+    print(f"throughput:  {len(everything) / elapsed:.1f} reruns/s")
+    print(f"wall time:   {elapsed:.2f}s")
+    print(f"memory:      {rss:.0f} MB RSS, {get_peak_rss_mb():.0f} MB peak")
+    print(f"per session: {(rss - baseline) / sessions:.1f} MB")
+    for result in failed[:5]:
+        print(f"error:       {result.errors[0]}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drive concurrent app sessions through a typical flow "
+        "with AppTest and report the rerun latency and memory."
+    )
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--slides", type=int, default=3)
+    parser.add_argument("--data", type=Path, default=ROOT / "sample" / "music_data.csv")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    share_runtime()
+
+    with tempfile.TemporaryDirectory() as script_dir:
+        script = Path(script_dir) / "app.py"
+        script.write_text(SCRIPT.format(data=str(args.data.resolve())), "utf8")
+
+        # a first session loads the modules and the shared caches, the memory
+        # of the measured sessions is counted from after it
+        warmup = run_session(script, args.slides, args.timeout)
+        if warmup.errors:
+            sys.exit(f"warmup failed: {warmup.errors[0]}")
+        baseline = get_rss_mb()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+            results = list(
+                executor.map(
+                    lambda _: run_session(script, args.slides, args.timeout),
+                    range(args.sessions),
+                )
+            )
+        elapsed = time.perf_counter() - start
+    report(results, elapsed, baseline, args.sessions)
+    if any(result.errors for result in results):
+        sys.exit(1)
+
+
+main()
@@ -0,0 +1,93 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import argparse
+from email.parser import BytesParser
+from email.policy import HTTP
+import gzip
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import time
+import uuid
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    # keep-alive, so clients can reuse their connections
+    protocol_version = "HTTP/1.1"
+    upload_dir: Path = Path("shared_stories")
+    delay: float = 0.0
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        if self.path != "/fileupload":
+            self.send_error(404)
+            return
+        body = self._decode(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if body is None:
+            self.send_error(415, "unsupported content encoding")
+            return
+        content = self._get_file(body)
+        if content is None:
+            self.send_error(400, "missing file field")
+            return
+        time.sleep(self.delay)
+        story_id = uuid.uuid4().hex
+        (self.upload_dir / f"{story_id}.html").write_bytes(content)
+        response = json.dumps({"id": story_id, "size": len(content)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format: str, *args: object) -> None:
+        # pylint: disable=redefined-builtin
+        pass
+
+    def _decode(self, body: bytes) -> bytes | None:
+        # the body as the client sent it, decoded by its Content-Encoding
+        encoding = self.headers.get("Content-Encoding", "identity")
+        if encoding == "identity":
+            return body
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "zstd":
+            try:
+                # pylint: disable=import-outside-toplevel,import-error
+                import zstandard  # type: ignore
+            except ImportError:
+                return None
+            return bytes(zstandard.ZstdDecompressor().decompressobj().decompress(body))
+        return None
+
+    def _get_file(self, body: bytes) -> bytes | None:
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+        message = BytesParser(policy=HTTP).parsebytes(header + body)
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                content = part.get_payload(decode=True)
+                return content if isinstance(content, bytes) else None
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the story upload server."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--upload-dir", type=Path, default=Path("shared_stories"))
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="seconds to wait per upload"
+    )
+    args = parser.parse_args()
+    args.upload_dir.mkdir(parents=True, exist_ok=True)
+    UploadHandler.upload_dir = args.upload_dir
+    UploadHandler.delay = args.delay
+    with ThreadingHTTPServer((args.host, args.port), UploadHandler) as server:
+        print(f"serving http://{args.host}:{args.port}/fileupload", flush=True)
+        server.serve_forever()
+
+
+main()
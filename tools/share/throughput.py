@@ -0,0 +1,93 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "src"))
+
+# pylint: disable=wrong-import-position
+from vizzu_builder.share import StoryUploader
+
+
+def wait_for_server(url: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server did not start at {url}")
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure story sharing throughput against the local server."
+    )
+    parser.add_argument("--shares", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument(
+        "--compression",
+        choices=["gzip", "zstd", "none"],
+        default=StoryUploader.COMPRESSION or "none",
+    )
+    args = parser.parse_args()
+
+    row = '{"Genres": "Pop", "Kinds": "Hard", "Popularity": 114},'
+    story_html = row * (args.size_kb * 1024 // len(row))
+    StoryUploader.URL = f"http://127.0.0.1:{args.port}/fileupload"
+    StoryUploader.COMPRESSION = None if args.compression == "none" else args.compression
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        with subprocess.Popen(
+            [
+                sys.executable,
+                str(Path(__file__).parent / "server.py"),
+                f"--port={args.port}",
+                f"--upload-dir={upload_dir}",
+                f"--delay={args.delay}",
+            ],
+            stdout=subprocess.DEVNULL,
+        ) as server:
+            try:
+                wait_for_server(f"http://127.0.0.1:{args.port}/")
+                start = time.perf_counter()
+                futures = [
+                    (time.perf_counter(), StoryUploader.submit(story_html))
+                    for _ in range(args.shares)
+                ]
+                latencies = []
+                failures = 0
+                for submitted, future in futures:
+                    result = future.result()
+                    latencies.append(time.perf_counter() - submitted)
+                    failures += not result.ok
+                elapsed = time.perf_counter() - start
+            finally:
+                server.terminate()
+
+    print(f"shares:     {args.shares} ({failures} failed)")
+    print(f"workers:    {StoryUploader.WORKERS}")
+    print(f"throughput: {args.shares / elapsed:.1f} shares/s")
+    print(f"raw data:   {args.shares * len(story_html) / elapsed / 1024**2:.1f} MB/s")
+    print(f"latency:    p50 {percentile(latencies, 0.5):.3f}s")
+    print(f"            p95 {percentile(latencies, 0.95):.3f}s")
+
+
+if __name__ == "__main__":
+    main()